@@ -0,0 +1,64 @@
+"""Shared SupportedAppProtocolReq fixtures for the SECC smoke scripts.
+
+EXI encoding goes through py4j/JVM, so results are memoized per process:
+the availability probe doubles as the encode of the default ISO 15118-2
+request, and each distinct offer is encoded once. The SECC Config is
+likewise parsed from the environment once, and each caller gets a copy.
+"""
+
+import copy
+import functools
+
+from iso15118.secc.secc_settings import Config
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.messages.app_protocol import AppProtocol, SupportedAppProtocolReq
+from iso15118.shared.messages.enums import ISOV2PayloadTypes, Namespace, Protocol
+from iso15118.shared.messages.v2gtp import V2GTPMessage
+from iso15118.shared.utils import load_requested_protocols
+
+
+@functools.lru_cache(maxsize=4)
+def sap_req_bytes(*protocols: Protocol) -> bytes:
+    """V2GTP-framed SAP request offering protocols in priority order
+    (ISO 15118-2 only when none are given)."""
+    apps = [
+        AppProtocol(
+            protocol_ns=proto.ns.value,
+            major_version=2,
+            minor_version=0,
+            schema_id=i,
+            priority=i,
+        )
+        for i, proto in enumerate(protocols or (Protocol.ISO_15118_2,), start=1)
+    ]
+    sap = SupportedAppProtocolReq(app_protocol=apps)
+    payload = EXI().to_exi(sap, Namespace.SAP)
+    return V2GTPMessage(Protocol.UNKNOWN, ISOV2PayloadTypes.EXI_ENCODED, payload).to_bytes()
+
+
+@functools.lru_cache(maxsize=1)
+def exi_available() -> bool:
+    # Probe by encoding the default request, which warms sap_req_bytes()
+    try:
+        sap_req_bytes()
+        return True
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _env_config() -> Config:
+    # Parsed from the environment once per process; never handed out itself
+    cfg = Config()
+    cfg.load_envs(env_path=None)
+    return cfg
+
+
+def secc_config(*protocols: str) -> Config:
+    """Per-caller copy of the environment-loaded Config, so no two sessions
+    share a mutable instance; protocols, when given, override PROTOCOLS on
+    this copy only so concurrent sessions can differ."""
+    cfg = copy.copy(_env_config())
+    if protocols:
+        cfg.supported_protocols = load_requested_protocols(list(protocols))
+    return cfg
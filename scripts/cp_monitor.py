@@ -20,12 +20,35 @@ Options:
 from __future__ import annotations
 
 import argparse
+import math
 import os
+import queue
+import threading
 import time
-from collections import deque, defaultdict
+from array import array
+from bisect import bisect_left
 
 from src.evse_hal.esp_cp_client import EspCpClient
 
+# SAE J1772 CP states; anything else is tallied under "U" (unknown)
+_CP_STATES = "ABCDEFU"
+_STATE_IDX = {s: i for i, s in enumerate(_CP_STATES)}
+_UNKNOWN_IDX = len(_CP_STATES) - 1
+
+_FMT_CHANGE = "[{:6.2f}s] CP {}->{} mv={} robust={} mode={} pwm_out%={}"
+_FMT_FLAP = "[WARN] {} state changes in last {:.0f}s (possible flapping)"
+_FMT_LIVE = "[{:6.2f}s] state={} mv={} robust={} mode={} pwm=en:{} duty%:{} hz:{}"
+
+
+def _printer(q: "queue.SimpleQueue") -> None:
+    """Format and print (fmt, args) records off the UART read loop; None stops."""
+    while True:
+        item = q.get()
+        if item is None:
+            return
+        fmt, args = item
+        print(fmt.format(*args))
+
 
 def main() -> int:
     ap = argparse.ArgumentParser()
@@ -39,70 +62,111 @@ def main() -> int:
     c = EspCpClient(port=args.port, baud=args.baud)
     c.connect()
 
+    # Hot-loop names bound to locals (LOAD_FAST instead of global/attr lookups)
+    mono = time.monotonic_ns
+    wall = time.time
+    sleep = time.sleep
+    get_batch = c.get_status_batch
+    state_idx = _STATE_IDX.get
+    max_chg = args.max_chg
+    window_s = args.window
+    window_ns = int(args.window * 1e9)
+    duration_ns = int(args.duration * 1e9)
+
     last = None
-    t0 = time.time()
-    changes: list[float] = []
-    chg_in_window: deque[float] = deque()
-    dwell: defaultdict[str, float] = defaultdict(float)
+    t0 = mono()
+    # Recent change timestamps (ns, sorted); prefix trimmed in bulk once past cap
+    chg_ts = array("q")
+    chg_append = chg_ts.append
+    chg_cap = math.ceil(args.max_chg * 4)
+    n_changes = 0
+    prev_chg_ts: int | None = None
+    min_int = 0
+    sum_int = 0
+    n_int = 0
+    dwell = [0] * len(_CP_STATES)
     last_state_ts = t0
     last_state = None
 
     print(f"[cpmon] Monitoring on {args.port} @ {args.baud} ...")
 
+    # Slow stdout (pipes, tee, serial consoles) must not stall frame handling
+    out: queue.SimpleQueue = queue.SimpleQueue()
+    emit = out.put
+    printer = threading.Thread(target=_printer, args=(out,), name="cpmon-print", daemon=True)
+    printer.start()
+
     try:
         while True:
-            st = c.get_status(wait_s=0.5)
-            now = time.time()
-            if st is None:
-                time.sleep(0.05)
+            batch = get_batch(32, wait_s=0.5)
+            now = mono()
+            if not batch:
+                if duration_ns and (now - t0) >= duration_ns:
+                    break
+                sleep(0.05)
                 continue
-            # Track dwell
-            if last_state is None:
-                last_state = st.state
-                last_state_ts = now
-            if st.state != last_state:
-                dt = max(0.0, now - last_state_ts)
-                dwell[last_state] += dt
-                changes.append(now)
-                chg_in_window.append(now)
-                while chg_in_window and (now - chg_in_window[0]) > args.window:
-                    chg_in_window.popleft()
-                print(
-                    f"[{now - t0:6.2f}s] CP {last_state}->{st.state} mv={st.cp_mv} robust={st.cp_mv_robust} "
-                    f"mode={st.mode} pwm_out%={getattr(st.pwm, 'out', '?')}"
-                )
-                last_state = st.state
-                last_state_ts = now
-                if len(chg_in_window) > args.max_chg:
-                    print(
-                        f"[WARN] {len(chg_in_window)} state changes in last {args.window:.0f}s (possible flapping)"
-                    )
-            # Periodic live line
-            if last is None or (now - last) >= 1.0:
+            # Frame receipt stamps are wall-clock; map them onto the monotonic
+            # timeline by their age so intervals stay exact within a batch
+            wall_now = wall()
+            for st in batch:
+                ts = now - int((wall_now - st.ts) * 1e9)
+                # Track dwell
+                if last_state is None:
+                    last_state = st.state
+                    last_state_ts = ts
+                if st.state != last_state:
+                    dwell[state_idx(last_state, _UNKNOWN_IDX)] += max(0, ts - last_state_ts)
+                    n_changes += 1
+                    if prev_chg_ts is not None:
+                        iv = ts - prev_chg_ts
+                        min_int = iv if n_int == 0 else min(min_int, iv)
+                        sum_int += iv
+                        n_int += 1
+                    prev_chg_ts = ts
+                    chg_append(ts)
+                    horizon = ts - window_ns
+                    if len(chg_ts) > chg_cap and chg_ts[0] < horizon:
+                        chg_ts = chg_ts[bisect_left(chg_ts, horizon):]
+                        chg_append = chg_ts.append
+                    emit((_FMT_CHANGE, (
+                        (ts - t0) / 1e9, last_state, st.state, st.cp_mv, st.cp_mv_robust,
+                        st.mode, getattr(st.pwm, "out", "?"),
+                    )))
+                    last_state = st.state
+                    last_state_ts = ts
+                    in_window = len(chg_ts) - bisect_left(chg_ts, horizon)
+                    if in_window > max_chg:
+                        emit((_FMT_FLAP, (in_window, window_s)))
+            # Periodic live line (latest frame of the batch)
+            if last is None or (now - last) >= 1_000_000_000:
                 last = now
-                print(
-                    f"[{now - t0:6.2f}s] state={st.state} mv={st.cp_mv} robust={st.cp_mv_robust} "
-                    f"mode={st.mode} pwm=en:{st.pwm.enabled} duty%:{st.pwm.duty} hz:{st.pwm.hz}"
-                )
+                emit((_FMT_LIVE, (
+                    (now - t0) / 1e9, st.state, st.cp_mv, st.cp_mv_robust,
+                    st.mode, st.pwm.enabled, st.pwm.duty, st.pwm.hz,
+                )))
 
-            if args.duration and (now - t0) >= args.duration:
+            if duration_ns and (now - t0) >= duration_ns:
                 break
     except KeyboardInterrupt:
         pass
+    finally:
+        # Flush pending lines before the summary
+        emit(None)
+        printer.join()
 
     # Summary
-    total = max(0.0, time.time() - t0)
+    end = mono()
+    total = max(0, end - t0) / 1e9
     # close last dwell
     if last_state is not None:
-        dwell[last_state] += max(0.0, time.time() - last_state_ts)
-    intervals = [j - i for i, j in zip(changes, changes[1:])]
-    avg_int = (sum(intervals) / len(intervals)) if intervals else 0.0
-    min_int = min(intervals) if intervals else 0.0
+        dwell[_STATE_IDX.get(last_state, _UNKNOWN_IDX)] += max(0, end - last_state_ts)
+    avg_int = (sum_int / n_int / 1e9) if n_int else 0.0
     print("\n[cpmon] Summary")
-    print(f"  duration: {total:.2f}s, changes: {len(changes)}")
-    print(f"  min interval: {min_int:.3f}s, avg interval: {avg_int:.3f}s")
-    for st in sorted(dwell.keys()):
-        print(f"  dwell[{st}]: {dwell[st]:.2f}s")
+    print(f"  duration: {total:.2f}s, changes: {n_changes}")
+    print(f"  min interval: {min_int / 1e9:.3f}s, avg interval: {avg_int:.3f}s")
+    for st, ns in zip(_CP_STATES, dwell):
+        if ns:
+            print(f"  dwell[{st}]: {ns / 1e9:.2f}s")
     return 0
 
 
@@ -7,6 +7,11 @@ import time
 import sys
 from pathlib import Path
 
+try:
+    import orjson  # Optional C-accelerated encoder for the event stream
+except ImportError:
+    orjson = None
+
 # Ensure repo root is on sys.path so 'src' package is importable
 HERE = Path(__file__).resolve().parent
 ROOT = HERE.parent
@@ -16,6 +21,12 @@ if str(ROOT) not in sys.path:
 from src.evse_hal.esp_periph_client import EspPeriphClient
 
 
+def _dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
 def main() -> None:
     p = argparse.ArgumentParser(description="ESP32-S3 peripheral coprocessor demo")
     p.add_argument("--port", default=None, help="Serial port (default from ESP_PERIPH_PORT or /dev/ttyUSB0)")
@@ -25,7 +36,7 @@ def main() -> None:
     c.connect()
 
     def on_evt(name: str, payload):
-        print("[EVT]", name, json.dumps(payload))
+        print("[EVT]", name, _dumps(payload))
 
     c.on_event(on_evt)
 
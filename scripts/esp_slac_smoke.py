@@ -6,7 +6,7 @@ Steps:
 - Ping the ESP via /esp/ping
 - Wait for CP state B/C via /vehicle/live
 - Start SLAC matching via /slac/start_matching (sim)
-- Time until MATCHED (or timeout); on timeout, try /esp/restart_slac and retry once
+- Time until MATCHED via /vehicle/slac (or timeout); on timeout, try /esp/restart_slac and retry once
 - Snapshot /vehicle/live (includes CP/SLAC/ISO and BMS data)
 
 Usage:
@@ -24,30 +24,106 @@ try:
     import httpx  # type: ignore
 except Exception:
     httpx = None
-    import urllib.request as urlreq
+    import http.client
+    from urllib.parse import urlsplit
 
 
-def _get(base: str, path: str) -> Dict[str, Any]:
-    url = base.rstrip("/") + path
+class _KeepAliveClient:
+    """Stand-in for httpx.Client when httpx is missing: one reused HTTP/1.1 connection."""
+
+    def __init__(self, base: str, timeout: float = 5.0) -> None:
+        u = urlsplit(base)
+        conn_cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+        self._conn = conn_cls(u.netloc, timeout=timeout)
+        self._prefix = u.path.rstrip("/")
+
+    def request(self, method: str, path: str, body: bytes | None = None, headers: Dict[str, str] | None = None) -> Dict[str, Any]:
+        for attempt in (0, 1):
+            try:
+                self._conn.request(method, self._prefix + path, body=body, headers=headers or {})
+                r = self._conn.getresponse()
+                data = r.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Server closed the idle keep-alive connection; reconnect once
+                self._conn.close()
+                if attempt:
+                    raise
+        if r.status >= 400:
+            raise RuntimeError(f"HTTP {r.status} for {method} {path}")
+        return json.loads(data.decode())
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "_KeepAliveClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _client(base: str):
+    """Open one persistent client for all requests against base."""
+    base = base.rstrip("/")
+    if httpx:
+        return httpx.Client(base_url=base, timeout=5.0)
+    return _KeepAliveClient(base, timeout=5.0)
+
+
+_EMPTY_BODY = b"{}"
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _get(cli, path: str) -> Dict[str, Any]:
     if httpx:
-        r = httpx.get(url, timeout=5.0)
+        r = cli.get(path)
         r.raise_for_status()
         return r.json()
-    with urlreq.urlopen(url, timeout=5.0) as r:  # type: ignore
-        return json.loads(r.read().decode())
+    return cli.request("GET", path)
 
 
-def _post(base: str, path: str, data: Dict[str, Any] | None = None) -> Dict[str, Any]:
-    url = base.rstrip("/") + path
-    payload = json.dumps(data or {}).encode()
-    headers = {"Content-Type": "application/json"}
+def _post(cli, path: str, data: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    payload = json.dumps(data).encode() if data else _EMPTY_BODY
     if httpx:
-        r = httpx.post(url, content=payload, headers=headers, timeout=5.0)
+        r = cli.post(path, content=payload, headers=_JSON_HEADERS)
         r.raise_for_status()
         return r.json()
-    req = urlreq.Request(url, data=payload, headers=headers, method="POST")  # type: ignore
-    with urlreq.urlopen(req, timeout=5.0) as r:  # type: ignore
-        return json.loads(r.read().decode())
+    return cli.request("POST", path, body=payload, headers=_JSON_HEADERS)
+
+
+# Poll backoff: react within ~10 ms of a change, settle at 2 Hz while idle
+_POLL_MIN_S = 0.01
+_POLL_MAX_S = 0.5
+
+
+def _backoff(delay: float, seen: Any, last_seen: Any) -> float:
+    """Return the next poll delay: reset on an observed change, else grow 1.5x."""
+    if seen != last_seen:
+        return _POLL_MIN_S
+    return min(_POLL_MAX_S, delay * 1.5)
+
+
+def _wait_matched(cli, timeout: float) -> float | None:
+    """Poll SLAC state until MATCHED; return seconds waited, or None on timeout.
+
+    Uses /vehicle/slac, which carries only the SLAC status, rather than the
+    full /vehicle/live aggregate (CP read, HLC and BMS snapshots).
+    """
+    start = time.time()
+    state = None
+    delay = _POLL_MIN_S
+    while time.time() < start + timeout:
+        prev = state
+        try:
+            state = (_get(cli, "/vehicle/slac").get("state") or "").upper()
+            if state == "MATCHED":
+                return time.time() - start
+        except Exception:
+            pass
+        delay = _backoff(delay, state, prev)
+        time.sleep(delay)
+    return None
 
 
 def main() -> int:
@@ -55,82 +131,69 @@ def main() -> int:
     ap.add_argument("--base", default="http://localhost:8000")
     ap.add_argument("--timeout", type=int, default=30, help="overall timeout (s)")
     args = ap.parse_args()
-    t0 = time.time()
-
-    print(f"[1/5] Pinging ESP at {args.base} ...", flush=True)
-    try:
-        pong = _post(args.base, "/esp/ping")
-        print("    pong:", pong.get("pong"))
-    except Exception as e:
-        print("    ERROR: /esp/ping failed:", e)
-        return 2
-
-    print("[2/5] Waiting for CP state B/C ...", flush=True)
-    deadline = time.time() + args.timeout
-    cp_state = None
-    while time.time() < deadline:
-        try:
-            live = _get(args.base, "/vehicle/live")
-            cp = (live.get("cp") or {})
-            cp_state = cp.get("state")
-            if cp_state in ("B", "C", "D"):
-                print("    CP:", cp)
-                break
-        except Exception:
-            pass
-        time.sleep(0.5)
-    else:
-        print("    TIMEOUT waiting for CP B/C/D")
-        return 3
-
-    print("[3/5] Starting SLAC matching (sim API) ...")
-    try:
-        _post(args.base, "/slac/start_matching")
-    except Exception as e:
-        print("    WARN: /slac/start_matching failed:", e)
-
-    print("[4/5] Waiting for SLAC MATCHED ...")
-    start = time.time()
-    matched = False
-    while time.time() < start + args.timeout:
-        try:
-            live = _get(args.base, "/vehicle/live")
-            slac = live.get("slac") or {}
-            if (slac.get("state") or "").upper() == "MATCHED":
-                matched = True
-                print("    SLAC matched in", round(time.time() - start, 2), "s")
-                break
-        except Exception:
-            pass
-        time.sleep(0.5)
-    if not matched:
-        print("    SLAC not matched in time; sending ESP restart hint and retrying once ...")
+    with _client(args.base) as cli:
+        t0 = time.time()
+
+        print(f"[1/5] Pinging ESP at {args.base} ...", flush=True)
         try:
-            _post(args.base, "/esp/restart_slac", {"reset_ms": 400})
+            pong = _post(cli, "/esp/ping")
+            print("    pong:", pong.get("pong"))
         except Exception as e:
-            print("    WARN: /esp/restart_slac failed:", e)
-        start = time.time()
-        while time.time() < start + args.timeout:
+            print("    ERROR: /esp/ping failed:", e)
+            return 2
+
+        print("[2/5] Waiting for CP state B/C ...", flush=True)
+        deadline = time.time() + args.timeout
+        cp_state = None
+        delay = _POLL_MIN_S
+        while time.time() < deadline:
+            prev = cp_state
             try:
-                live = _get(args.base, "/vehicle/live")
-                slac = live.get("slac") or {}
-                if (slac.get("state") or "").upper() == "MATCHED":
-                    matched = True
-                    print("    SLAC matched in", round(time.time() - start, 2), "s (after restart)")
+                live = _get(cli, "/vehicle/live")
+                cp = (live.get("cp") or {})
+                cp_state = cp.get("state")
+                if cp_state in ("B", "C", "D"):
+                    print("    CP:", cp)
                     break
             except Exception:
                 pass
-            time.sleep(0.5)
+            delay = _backoff(delay, cp_state, prev)
+            time.sleep(delay)
+        else:
+            print("    TIMEOUT waiting for CP B/C/D")
+            return 3
 
-    print("[5/5] Snapshot /vehicle/live ...")
-    try:
-        live = _get(args.base, "/vehicle/live")
-        print(json.dumps(live, indent=2))
-    except Exception as e:
-        print("    ERROR: /vehicle/live failed:", e)
+        print("[3/5] Starting SLAC matching (sim API) ...")
+        try:
+            _post(cli, "/slac/start_matching")
+        except Exception as e:
+            print("    WARN: /slac/start_matching failed:", e)
+
+        print("[4/5] Waiting for SLAC MATCHED ...")
+        elapsed = _wait_matched(cli, args.timeout)
+        matched = elapsed is not None
+        if matched:
+            print("    SLAC matched in", round(elapsed, 2), "s")
+        else:
+            print("    SLAC not matched in time; sending ESP restart hint and retrying once ...")
+            try:
+                _post(cli, "/esp/restart_slac", {"reset_ms": 400})
+            except Exception as e:
+                print("    WARN: /esp/restart_slac failed:", e)
+            elapsed = _wait_matched(cli, args.timeout)
+            matched = elapsed is not None
+            if matched:
+                print("    SLAC matched in", round(elapsed, 2), "s (after restart)")
+
+        print("[5/5] Snapshot /vehicle/live ...")
+        try:
+            live = _get(cli, "/vehicle/live")
+            print(json.dumps(live, indent=2))
+        except Exception as e:
+            print("    ERROR: /vehicle/live failed:", e)
 
-    print("Done in", round(time.time() - t0, 2), "s")
-    return 0 if matched else 4
+        print("Done in", round(time.time() - t0, 2), "s")
+        return 0 if matched else 4
 
 
 if __name__ == "__main__":
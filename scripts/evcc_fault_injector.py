@@ -4,7 +4,7 @@ EVCC-side fault injection helper to exercise SECC robustness to corruption and l
 
 Usage examples:
 
-  # Send 3 malformed EXI frames (valid V2GTP header, random payload)
+  # Send 3 malformed EXI frames (valid V2GTP header, a fresh random payload each)
   python scripts/evcc_fault_injector.py --host 127.0.0.1 --port 65000 --mode corrupt-exi --count 3 --size 64
 
   # Send the same frame twice quickly to trigger duplicate handling
@@ -19,99 +19,187 @@ Notes:
  - This script does not build valid EXI messages; it is intended to probe loss/corruption paths.
 """
 
-import argparse
 import asyncio
 import os
 import random
+import struct
 import sys
-from typing import Optional
+from types import SimpleNamespace
+from typing import Optional, Sequence, Tuple
 
+try:
+    import uvloop  # Optional libuv-based event loop
+except ImportError:
+    uvloop = None
 
-def _mk_v2gtp(protocol: str, payload_type: int, payload: bytes) -> bytes:
-    # V2GTP header: [0]=0x01, [1]=0xFE, [2:4]=payload type, [4:8]=len
+
+# V2GTP header: version, inverse version, payload type, payload length
+_V2GTP_HDR = struct.Struct(">BBHI")
+
+
+def _mk_v2gtp(protocol: str, payload_type: int, payload: bytes) -> Tuple[bytes, bytes]:
+    # Header and payload are kept apart and handed to writelines() as-is
     if protocol not in ("iso2", "v20"):
         raise ValueError("protocol must be 'iso2' or 'v20'")
-    header = bytearray(8)
-    header[0] = 0x01
-    header[1] = 0xFE
-    header[2:4] = int(payload_type).to_bytes(2, "big")
-    header[4:8] = len(payload).to_bytes(4, "big")
-    return bytes(header) + payload
+    return _V2GTP_HDR.pack(0x01, 0xFE, int(payload_type), len(payload)), payload
 
 
-def _mk_bad_header(payload: bytes) -> bytes:
+def _mk_bad_header(payload: bytes) -> Tuple[bytes, bytes]:
     # Break the inverse protocol version
-    header = bytearray(8)
-    header[0] = 0x01
-    header[1] = 0x00  # invalid inverse byte
-    header[2:4] = (0x8001).to_bytes(2, "big")
-    header[4:8] = len(payload).to_bytes(4, "big")
-    return bytes(header) + payload
+    return _V2GTP_HDR.pack(0x01, 0x00, 0x8001, len(payload)), payload
 
 
-async def _send_and_maybe_read(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, data: bytes, read_timeout: float) -> Optional[bytes]:
-    writer.write(data)
+async def _send_and_maybe_read(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, frame: Tuple[bytes, bytes], read_timeout: float) -> None:
+    writer.writelines(frame)
     await writer.drain()
     if read_timeout <= 0:
-        return None
+        return
     try:
-        # Attempt to read a V2GTP header from SECC; do not parse further here
-        hdr = await asyncio.wait_for(reader.readexactly(8), timeout=read_timeout)
+        # Drain one V2GTP response from SECC; its content is not inspected
+        hdr = await asyncio.wait_for(reader.readexactly(_V2GTP_HDR.size), timeout=read_timeout)
+        length = _V2GTP_HDR.unpack_from(hdr)[3]
+        if length > 0:
+            await asyncio.wait_for(reader.readexactly(length), timeout=read_timeout)
     except Exception:
+        return
+
+
+async def _drain_responses(reader: asyncio.StreamReader) -> None:
+    # Read and discard V2GTP responses until EOF or cancellation
+    try:
+        while True:
+            hdr = await reader.readexactly(_V2GTP_HDR.size)
+            length = _V2GTP_HDR.unpack_from(hdr)[3]
+            if length > 0:
+                await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return
+
+
+async def _send_pipelined(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, frames: Sequence[Tuple[bytes, bytes]], interval: float, read_timeout: float) -> None:
+    """Send frames paced by interval while responses are drained concurrently.
+
+    Pacing no longer waits for a round trip per frame; after the last send the
+    drain task gets read_timeout to collect trailing responses.
+    """
+    drain = asyncio.create_task(_drain_responses(reader)) if read_timeout > 0 else None
+    try:
+        for frame in frames:
+            writer.writelines(frame)
+            await writer.drain()
+            await asyncio.sleep(interval)
+        if drain is not None:
+            await asyncio.wait_for(drain, timeout=read_timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        if drain is not None and not drain.done():
+            drain.cancel()
+
+
+def _payload_type(x: str) -> int:
+    return int(x, 0)
+
+
+# One table for both parsers: (flag, type, default, choices, required, help).
+# _parse_fast() serves harnesses that spawn this script in tight loops without
+# importing argparse; _build_parser() handles everything it bails on.
+_OPTIONS = (
+    ("--host", str, None, None, True, "SECC host (IP)"),
+    ("--port", int, None, None, True, "SECC TCP port"),
+    ("--mode", str, None, ("corrupt-exi", "duplicate", "bad-header"), True, None),
+    ("--protocol", str, "iso2", ("iso2", "v20"), False, None),
+    ("--payload-type", _payload_type, 0x8001, None, False, "Payload type (default 0x8001 EXI_ENCODED)"),
+    ("--payload-hex", str, None, None, False, "Hex payload to send (overrides --size)"),
+    ("--size", int, 32, None, False, "Random payload size if --payload-hex not set"),
+    ("--seed", int, None, None, False, "Seed for reproducible random payloads (default: os.urandom)"),
+    ("--count", int, 1, None, False, "Number of frames to send"),
+    ("--interval", float, 0.1, None, False, "Interval between frames (s)"),
+    ("--read-timeout", float, 0.5, None, False, "Read timeout after send (s); 0 disables reading"),
+)
+
+
+def _build_parser():
+    import argparse
+
+    ap = argparse.ArgumentParser(description="EVCC fault injector (TCP)")
+    for flag, conv, default, choices, required, help_ in _OPTIONS:
+        kwargs = {"choices": choices, "help": help_}
+        if required:
+            kwargs["required"] = True
+        else:
+            kwargs["default"] = default
+        if conv is not str:
+            kwargs["type"] = conv
+        ap.add_argument(flag, **kwargs)
+    return ap
+
+
+def _dest(flag: str) -> str:
+    return flag[2:].replace("-", "_")
+
+
+_FAST_FLAGS = {flag: (_dest(flag), conv) for flag, conv, *_ in _OPTIONS}
+_FAST_DEFAULTS = {_dest(flag): default for flag, _, default, _, required, _ in _OPTIONS if not required}
+_FAST_REQUIRED = tuple(_dest(flag) for flag, _, _, _, required, _ in _OPTIONS if required)
+_FAST_CHOICES = {_dest(flag): choices for flag, _, _, choices, _, _ in _OPTIONS if choices}
+
+
+def _parse_fast(argv: Sequence[str]) -> Optional[SimpleNamespace]:
+    """Parse plain "--flag value" pairs; return None for anything argparse should
+    handle (--help, --flag=value, unknown flags, bad values, missing required)."""
+    if len(argv) % 2:
         return None
+    ns = dict(_FAST_DEFAULTS)
     try:
-        length = int.from_bytes(hdr[4:8], "big")
-        if length > 0:
-            body = await asyncio.wait_for(reader.readexactly(length), timeout=read_timeout)
-            return hdr + body
-        return hdr
-    except Exception:
-        return hdr
+        for flag, val in zip(argv[::2], argv[1::2]):
+            dest, conv = _FAST_FLAGS[flag]
+            ns[dest] = conv(val)
+    except (KeyError, ValueError):
+        return None
+    if not all(k in ns for k in _FAST_REQUIRED):
+        return None
+    if any(ns[k] not in ok for k, ok in _FAST_CHOICES.items()):
+        return None
+    return SimpleNamespace(**ns)
 
 
 async def main():
-    ap = argparse.ArgumentParser(description="EVCC fault injector (TCP)")
-    ap.add_argument("--host", required=True, help="SECC host (IP)")
-    ap.add_argument("--port", type=int, required=True, help="SECC TCP port")
-    ap.add_argument("--mode", choices=["corrupt-exi", "duplicate", "bad-header"], required=True)
-    ap.add_argument("--protocol", choices=["iso2", "v20"], default="iso2")
-    ap.add_argument("--payload-type", type=lambda x: int(x, 0), default=0x8001, help="Payload type (default 0x8001 EXI_ENCODED)")
-    ap.add_argument("--payload-hex", help="Hex payload to send (overrides --size)")
-    ap.add_argument("--size", type=int, default=32, help="Random payload size if --payload-hex not set")
-    ap.add_argument("--count", type=int, default=1, help="Number of frames to send")
-    ap.add_argument("--interval", type=float, default=0.1, help="Interval between frames (s)")
-    ap.add_argument("--read-timeout", type=float, default=0.5, help="Read timeout after send (s); 0 disables reading")
-    args = ap.parse_args()
+    args = _parse_fast(sys.argv[1:]) or _build_parser().parse_args()
 
+    count = max(1, args.count)
+    interval = max(0.0, args.interval)
     if args.payload_hex:
         try:
-            payload = bytes.fromhex(args.payload_hex)
+            payloads = [bytes.fromhex(args.payload_hex)]
         except Exception:
             print("Invalid --payload-hex", file=sys.stderr)
             sys.exit(2)
     else:
-        random.seed(os.urandom(8))
-        payload = bytes(random.getrandbits(8) for _ in range(max(0, int(args.size))))
+        # corrupt-exi gets a distinct payload per frame, drawn in a single call
+        size = max(0, int(args.size))
+        n = count if args.mode == "corrupt-exi" else 1
+        if args.seed is not None:
+            buf = memoryview(random.Random(args.seed).randbytes(size * n))
+        else:
+            buf = memoryview(os.urandom(size * n))
+        payloads = [buf[i * size:(i + 1) * size] for i in range(n)]
 
     reader, writer = await asyncio.open_connection(args.host, args.port)
     try:
         if args.mode == "bad-header":
-            frame = _mk_bad_header(payload)
+            frame = _mk_bad_header(payloads[0])
             await _send_and_maybe_read(reader, writer, frame, args.read_timeout)
             return
 
         # Valid V2GTP header; payload may be arbitrary
-        frame = _mk_v2gtp(args.protocol, args.payload_type, payload)
-
         if args.mode == "corrupt-exi":
-            for i in range(max(1, args.count)):
-                _ = await _send_and_maybe_read(reader, writer, frame, args.read_timeout)
-                await asyncio.sleep(max(0.0, args.interval))
+            frames = [_mk_v2gtp(args.protocol, args.payload_type, payloads[i % len(payloads)]) for i in range(count)]
+            await _send_pipelined(reader, writer, frames, interval, args.read_timeout)
         elif args.mode == "duplicate":
             # Send the same frame repeatedly to trigger duplicate detection
-            for i in range(max(1, args.count)):
-                _ = await _send_and_maybe_read(reader, writer, frame, args.read_timeout)
-                await asyncio.sleep(max(0.0, args.interval))
+            frame = _mk_v2gtp(args.protocol, args.payload_type, payloads[0])
+            await _send_pipelined(reader, writer, [frame] * count, interval, args.read_timeout)
         else:
             raise AssertionError("unreachable")
     finally:
@@ -123,5 +211,6 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop.run when available (uvloop >= 0.18), else the stdlib loop
+    getattr(uvloop, "run", asyncio.run)(main())
 
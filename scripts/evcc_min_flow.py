@@ -12,33 +12,54 @@ without implementing the full payment/charge loop.
 
 import argparse
 import asyncio
+import functools
 import os
+import struct
 import sys
 from typing import Tuple
 
+try:
+    import uvloop  # Optional libuv-based event loop
+except ImportError:
+    uvloop = None
+
 from iso15118.shared.exi_codec import EXI
 from iso15118.shared.messages.app_protocol import AppProtocol, SupportedAppProtocolReq, ResponseCodeSAP
 from iso15118.shared.messages.enums import ISOV2PayloadTypes, Namespace, Protocol
 from iso15118.shared.messages.iso15118_2.body import Body, ServiceDiscoveryReq, SessionSetupReq
 from iso15118.shared.messages.iso15118_2.header import MessageHeader
 from iso15118.shared.messages.iso15118_2.msgdef import V2GMessage as V2GMessageV2
-from iso15118.shared.messages.v2gtp import V2GTPMessage
+
+# One codec instance shared by every encode/decode in this run
+_EXI = EXI()
+# V2GTP header: version, inverse version, payload type, payload length
+_V2GTP_HDR = struct.Struct(">BBHI")
 
 
 async def _send_and_recv(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, data: bytes, timeout: float = 2.0) -> bytes:
     writer.write(data)
     await writer.drain()
     # Read V2GTP header
-    hdr = await asyncio.wait_for(reader.readexactly(8), timeout=timeout)
-    length = int.from_bytes(hdr[4:8], "big")
+    hdr = await asyncio.wait_for(reader.readexactly(_V2GTP_HDR.size), timeout=timeout)
+    length = _V2GTP_HDR.unpack_from(hdr)[3]
     body = b""
     if length:
         body = await asyncio.wait_for(reader.readexactly(length), timeout=timeout)
     return hdr + body
 
 
+# Constant first half of the V2GTP header (version, inverse version, payload type)
+# for every (protocol, payload type) pair this script sends
+_V2GTP_PREFIX = {
+    (proto, ptype): struct.pack(">BBH", 0x01, 0xFE, ptype.value)
+    for proto in (Protocol.UNKNOWN, Protocol.ISO_15118_2)
+    for ptype in (ISOV2PayloadTypes.EXI_ENCODED,)
+}
+_V2GTP_LEN = struct.Struct(">I")
+
+
 def _wrap_v2gtp(protocol: Protocol, payload_type: ISOV2PayloadTypes, payload: bytes) -> bytes:
-    return V2GTPMessage(protocol, payload_type, payload).to_bytes()
+    return b"".join((_V2GTP_PREFIX[(protocol, payload_type)], _V2GTP_LEN.pack(len(payload)), payload))
 
 
 def _make_sap_req() -> bytes:
@@ -53,24 +74,26 @@ def _make_sap_req() -> bytes:
         )
     ]
     req = SupportedAppProtocolReq(app_protocol=app)
-    exi = EXI().to_exi(req, Namespace.SAP)
+    exi = _EXI.to_exi(req, Namespace.SAP)
     return _wrap_v2gtp(Protocol.UNKNOWN, ISOV2PayloadTypes.EXI_ENCODED, exi)
 
 
+@functools.lru_cache(maxsize=8)
 def _make_session_setup_req(evcc_id_hex: str) -> Tuple[bytes, str]:
     # SessionID must be hex string (8 bytes → 16 hex chars); use zeros initially
     header = MessageHeader(session_id="0" * 16)
     body = Body(session_setup_req=SessionSetupReq(evcc_id=evcc_id_hex))
     msg = V2GMessageV2(header=header, body=body)
-    exi = EXI().to_exi(msg, Namespace.ISO_V2_MSG_DEF)
+    exi = _EXI.to_exi(msg, Namespace.ISO_V2_MSG_DEF)
     return _wrap_v2gtp(Protocol.ISO_15118_2, ISOV2PayloadTypes.EXI_ENCODED, exi), str(msg)
 
 
+@functools.lru_cache(maxsize=1)
 def _make_service_discovery_req() -> Tuple[bytes, str]:
     header = MessageHeader(session_id="0" * 16)
     body = Body(service_discovery_req=ServiceDiscoveryReq())
     msg = V2GMessageV2(header=header, body=body)
-    exi = EXI().to_exi(msg, Namespace.ISO_V2_MSG_DEF)
+    exi = _EXI.to_exi(msg, Namespace.ISO_V2_MSG_DEF)
     return _wrap_v2gtp(Protocol.ISO_15118_2, ISOV2PayloadTypes.EXI_ENCODED, exi), str(msg)
 
 
@@ -81,7 +104,7 @@ async def run_flow(host: str, port: int, duplicate_sd: bool, corrupt_after_sap:
         sap_req = _make_sap_req()
         resp = await _send_and_recv(reader, writer, sap_req, timeout=read_to)
         payload = resp[8:]
-        sap = EXI().from_exi(payload, Namespace.SAP)
+        sap = _EXI.from_exi(payload, Namespace.SAP)
         if not hasattr(sap, "response_code") or sap.response_code not in (
             ResponseCodeSAP.NEGOTIATION_OK,
             ResponseCodeSAP.MINOR_DEVIATION,
@@ -93,17 +116,18 @@ async def run_flow(host: str, port: int, duplicate_sd: bool, corrupt_after_sap:
         if corrupt_after_sap:
             # Flip one byte in a valid SessionSetupReq to simulate corruption
             frame, name = _make_session_setup_req("A1B2C3D4E5F6")
-            # Corrupt payload body
-            frame = frame[:12] + bytes([frame[12] ^ 0xFF]) + frame[13:]
+            # Corrupt payload body on a copy; the cached clean frame is sent next
+            bad = bytearray(frame)
+            bad[12] ^= 0xFF
             try:
-                _ = await _send_and_recv(reader, writer, frame, timeout=read_to)
+                _ = await _send_and_recv(reader, writer, bytes(bad), timeout=read_to)
             except Exception:
                 pass
 
         # 2) SessionSetup
         frame, name = _make_session_setup_req("A1B2C3D4E5F6")
         resp = await _send_and_recv(reader, writer, frame, timeout=read_to)
-        v2g = EXI().from_exi(resp[8:], Namespace.ISO_V2_MSG_DEF)
+        v2g = _EXI.from_exi(resp[8:], Namespace.ISO_V2_MSG_DEF)
         print("RX:", str(v2g))
 
         # 3) ServiceDiscovery
@@ -112,7 +136,7 @@ async def run_flow(host: str, port: int, duplicate_sd: bool, corrupt_after_sap:
             await asyncio.sleep(pause_before_sd)
         sd_frame, sd_name = _make_service_discovery_req()
         resp1 = await _send_and_recv(reader, writer, sd_frame, timeout=read_to)
-        v2g1 = EXI().from_exi(resp1[8:], Namespace.ISO_V2_MSG_DEF)
+        v2g1 = _EXI.from_exi(resp1[8:], Namespace.ISO_V2_MSG_DEF)
         print("RX:", str(v2g1))
 
         if duplicate_sd:
@@ -143,4 +167,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop.run when available (uvloop >= 0.18), else the stdlib loop
+    getattr(uvloop, "run", asyncio.run)(main())
@@ -7,9 +7,15 @@ Procedure:
 """
 
 import asyncio
+import struct
 import sys
 from pathlib import Path
 
+try:
+    import uvloop  # Optional libuv-based event loop
+except ImportError:
+    uvloop = None
+
 # Ensure local 'src' takes precedence for iso15118 imports
 HERE = Path(__file__).resolve().parent.parent
 LOCAL_ISO15118_ROOT = HERE / "src" / "iso15118"
@@ -22,171 +28,18 @@ from iso15118.secc.comm_session_handler import SECCCommunicationSession
 from iso15118.secc.secc_settings import Config
 from iso15118.shared.notifications import StopNotification
 
-from iso15118.secc.controller.interface import (
-    EVSEControllerInterface,
-    ServiceStatus,
-    SessionStopAction,
-)
-
-
-def _mk_bad_header(payload: bytes) -> bytes:
-    header = bytearray(8)
-    header[0] = 0x01
-    header[1] = 0x00  # invalid inverse byte (should be 0xFE)
-    header[2:4] = (0x8001).to_bytes(2, "big")
-    header[4:8] = len(payload).to_bytes(4, "big")
-    return bytes(header) + payload
-
-
-class _DummyEVSEController(EVSEControllerInterface):
-    def __init__(self):
-        super().__init__()
-        self.stop_charger_called = False
-
-    async def set_status(self, status: ServiceStatus) -> None:
-        return None
-
-    async def get_evse_id(self, protocol):
-        return "EVSE-TEST-01"
-
-    async def get_supported_energy_transfer_modes(self, protocol):
-        return []
-
-    async def get_schedule_exchange_params(self, *args, **kwargs):
-        return None
-
-    async def get_energy_service_list(self):
-        return None
-
-    def is_eim_authorized(self) -> bool:
-        return True
-
-    async def is_authorized(self, *args, **kwargs):
-        class _Resp:
-            authorization_status = None
-            certificate_response_status = None
-
-        return _Resp()
-
-    async def get_sa_schedule_list(self, *args, **kwargs):
-        return None
-
-    async def get_sa_schedule_list_dinspec(self, *args, **kwargs):
-        return None
-
-    async def get_meter_info_v2(self):
-        return None
-
-    async def get_meter_info_v20(self):
-        return None
-
-    async def get_supported_providers(self):
-        return None
-
-    async def set_hlc_charging(self, is_ongoing: bool) -> None:
-        return None
-
-    async def get_cp_state(self):
-        from iso15118.shared.messages.enums import CpState
-
-        return CpState.C2
-
-    async def service_renegotiation_supported(self) -> bool:
-        return False
-
-    async def stop_charger(self) -> None:
-        self.stop_charger_called = True
-
-    async def update_data_link(self, action: SessionStopAction) -> None:
-        return None
+from _dummy_evse import DummyEVSEController
 
-    async def set_present_protocol_state(self, state):
-        return None
 
-    async def get_ac_evse_status(self):
-        return None
+_V2GTP_HDR = struct.Struct(">BBHI")
 
-    async def get_ac_charge_params_v2(self):
-        return None
 
-    async def get_ac_charge_params_v20(self, energy_service):
-        return None
-
-    async def get_ac_charge_params_v20(self):
-        return None
-
-    async def get_evse_status(self):
-        return None
-
-    async def is_contactor_closed(self):
-        return None
-
-    async def is_contactor_opened(self) -> bool:
-        return True
-
-    async def get_dc_evse_status(self):
-        return None
-
-    async def get_dc_charge_params_v2(self):
-        return None
-
-    async def get_dc_charge_params_v20(self, energy_service):
-        return None
-
-    async def get_dc_charge_parameter_limits_v20(self, *args, **kwargs):
-        return None
-
-    async def get_ac_charge_parameter_limits_v20(self, *args, **kwargs):
-        return None
-
-    async def get_dc_charge_loop_params_v20(self, *args, **kwargs):
-        return None
-
-    async def get_ac_charge_loop_params_v20(self, *args, **kwargs):
-        return None
-
-    async def get_15118_ev_certificate(self, *args, **kwargs) -> str:
-        return ""
-
-    def ready_to_charge(self) -> bool:
-        return True
-
-    async def session_ended(self, current_state: str, reason: str):
-        return None
-
-    async def send_display_params(self):
-        return None
-
-    async def send_rated_limits(self):
-        return None
-
-    async def get_service_parameter_list(self, service_id: int):
-        return None
-
-    async def get_dc_charge_parameters(self):
-        return None
-
-    async def start_cable_check(self):
-        return None
-
-    async def get_cable_check_status(self):
-        return None
-
-    async def send_charging_command(
-        self,
-        evse_present_voltage=None,
-        evse_present_current=None,
-    ):
-        return None
-
-    async def is_evse_current_limit_achieved(self):
-        return False
-
-    async def is_evse_voltage_limit_achieved(self):
-        return False
-
-    async def is_evse_power_limit_achieved(self) -> bool:
-        return False
+def _mk_bad_header(payload: bytes) -> bytes:
+    frame = bytearray(_V2GTP_HDR.size + len(payload))
+    # invalid inverse byte 0x00 (should be 0xFE)
+    _V2GTP_HDR.pack_into(frame, 0, 0x01, 0x00, 0x8001, len(payload))
+    frame[_V2GTP_HDR.size:] = payload
+    return bytes(frame)
 
 
 async def _start_ev_server(host: str, port: int):
@@ -220,9 +73,10 @@ async def main():
     port = sockets[0].getsockname()[1]
     try:
         reader, writer = await asyncio.open_connection(host, port)
-        q: asyncio.Queue = asyncio.Queue()
+        # The session posts exactly one StopNotification
+        q: asyncio.Queue = asyncio.Queue(maxsize=1)
         cfg = Config()
-        evse = _DummyEVSEController()
+        evse = DummyEVSEController()
         secc = SECCCommunicationSession((reader, writer), q, cfg, evse, evse_id="EVSE-TEST-01")
         task = asyncio.create_task(secc.start(timeout=0.5))
         # For invalid header, current implementation raises and terminates session
@@ -240,4 +94,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    raise SystemExit(asyncio.run(main()))
+    # uvloop.run when available (uvloop >= 0.18), else the stdlib loop
+    raise SystemExit(getattr(uvloop, "run", asyncio.run)(main()))
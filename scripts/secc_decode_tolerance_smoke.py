@@ -13,6 +13,11 @@ import os
 import sys
 from pathlib import Path
 
+try:
+    import uvloop  # Optional libuv-based event loop
+except ImportError:
+    uvloop = None
+
 # Ensure local 'src' takes precedence for iso15118 imports
 HERE = Path(__file__).resolve().parent.parent
 LOCAL_ISO15118_ROOT = HERE / "src" / "iso15118"
@@ -25,11 +30,7 @@ from iso15118.secc.comm_session_handler import SECCCommunicationSession
 from iso15118.secc.secc_settings import Config
 from iso15118.shared.notifications import StopNotification
 
-from iso15118.secc.controller.interface import (
-    EVSEControllerInterface,
-    ServiceStatus,
-    SessionStopAction,
-)
+from _dummy_evse import DummyEVSEController
 
 
 def _mk_v2gtp_frame(payload: bytes) -> bytes:
@@ -42,154 +43,6 @@ def _mk_v2gtp_frame(payload: bytes) -> bytes:
     return bytes(header) + payload
 
 
-class _DummyEVSEController(EVSEControllerInterface):
-    def __init__(self):
-        super().__init__()
-        self.stop_charger_called = False
-
-    async def set_status(self, status: ServiceStatus) -> None:
-        return None
-
-    async def get_evse_id(self, protocol):
-        return "EVSE-TEST-01"
-
-    async def get_supported_energy_transfer_modes(self, protocol):
-        return []
-
-    async def get_schedule_exchange_params(self, *args, **kwargs):
-        return None
-
-    async def get_energy_service_list(self):
-        return None
-
-    def is_eim_authorized(self) -> bool:
-        return True
-
-    async def is_authorized(self, *args, **kwargs):
-        class _Resp:
-            authorization_status = None
-            certificate_response_status = None
-
-        return _Resp()
-
-    async def get_sa_schedule_list(self, *args, **kwargs):
-        return None
-
-    async def get_sa_schedule_list_dinspec(self, *args, **kwargs):
-        return None
-
-    async def get_meter_info_v2(self):
-        return None
-
-    async def get_meter_info_v20(self):
-        return None
-
-    async def get_supported_providers(self):
-        return None
-
-    async def set_hlc_charging(self, is_ongoing: bool) -> None:
-        return None
-
-    async def get_cp_state(self):
-        from iso15118.shared.messages.enums import CpState
-
-        return CpState.C2
-
-    async def service_renegotiation_supported(self) -> bool:
-        return False
-
-    async def stop_charger(self) -> None:
-        self.stop_charger_called = True
-
-    async def set_present_protocol_state(self, state):
-        return None
-
-    async def get_ac_evse_status(self):
-        return None
-
-    async def get_ac_charge_params_v2(self):
-        return None
-
-    async def get_ac_charge_params_v20(self, energy_service):
-        return None
-
-    async def get_evse_status(self):
-        return None
-
-    async def is_contactor_closed(self):
-        return None
-
-    async def is_contactor_opened(self) -> bool:
-        return True
-
-    async def get_dc_evse_status(self):
-        return None
-
-    async def get_dc_charge_params_v2(self):
-        return None
-
-    async def get_dc_charge_params_v20(self, energy_service):
-        return None
-
-    async def get_dc_charge_parameter_limits_v20(self, *args, **kwargs):
-        return None
-
-    async def get_ac_charge_parameter_limits_v20(self, *args, **kwargs):
-        return None
-
-    async def get_dc_charge_loop_params_v20(self, *args, **kwargs):
-        return None
-
-    async def get_ac_charge_loop_params_v20(self, *args, **kwargs):
-        return None
-
-    async def get_15118_ev_certificate(self, *args, **kwargs) -> str:
-        return ""
-
-    async def update_data_link(self, action: SessionStopAction) -> None:
-        return None
-
-    def ready_to_charge(self) -> bool:
-        return True
-
-    async def session_ended(self, current_state: str, reason: str):
-        return None
-
-    async def send_display_params(self):
-        return None
-
-    async def send_rated_limits(self):
-        return None
-
-    async def get_service_parameter_list(self, service_id: int):
-        return None
-
-    async def get_dc_charge_parameters(self):
-        return None
-
-    async def start_cable_check(self):
-        return None
-
-    async def get_cable_check_status(self):
-        return None
-
-    async def send_charging_command(
-        self,
-        evse_present_voltage=None,
-        evse_present_current=None,
-    ):
-        return None
-
-    async def is_evse_current_limit_achieved(self):
-        return False
-
-    async def is_evse_voltage_limit_achieved(self):
-        return False
-
-    async def is_evse_power_limit_achieved(self) -> bool:
-        return False
-
-
 async def _start_ev_server(host: str, port: int):
     # Create three corrupted frames
     frames = [_mk_v2gtp_frame(os.urandom(64)) for _ in range(3)]
@@ -227,19 +80,22 @@ async def main():
     port = sockets[0].getsockname()[1]
     try:
         reader, writer = await asyncio.open_connection(host, port)
-        q: asyncio.Queue = asyncio.Queue()
+        # The session posts exactly one StopNotification
+        q: asyncio.Queue = asyncio.Queue(maxsize=1)
         cfg = Config()
         # Load defaults into shared_settings to avoid KeyError in EXI logging paths
         try:
             cfg.load_envs(env_path=None)
         except Exception:
             pass
-        evse = _DummyEVSEController()
+        evse = DummyEVSEController()
         secc = SECCCommunicationSession((reader, writer), q, cfg, evse, evse_id="EVSE-TEST-01")
         task = asyncio.create_task(secc.start(timeout=0.5))
-        notif: StopNotification = await asyncio.wait_for(q.get(), timeout=10.0)
+        # The session posts its StopNotification before its task returns, so
+        # awaiting the task alone is enough; the queue is then read without waiting
+        await asyncio.wait_for(task, timeout=20.0)
+        notif = None if q.empty() else q.get_nowait()
         ok = isinstance(notif, StopNotification) and evse.stop_charger_called
-        await asyncio.wait_for(task, timeout=10.0)
         print("result:", "PASS" if ok else "FAIL")
         return 0 if ok else 1
     finally:
@@ -248,4 +104,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    raise SystemExit(asyncio.run(main()))
+    # uvloop.run when available (uvloop >= 0.18), else the stdlib loop
+    raise SystemExit(getattr(uvloop, "run", asyncio.run)(main()))
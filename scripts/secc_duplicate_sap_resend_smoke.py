@@ -11,8 +11,15 @@ Procedure:
 """
 
 import asyncio
+import struct
 import sys
 from pathlib import Path
+from typing import Tuple
+
+try:
+    import uvloop  # Optional libuv-based event loop
+except ImportError:
+    uvloop = None
 
 # Ensure local 'src' takes precedence for iso15118 imports
 HERE = Path(__file__).resolve().parent.parent
@@ -23,55 +30,29 @@ if (LOCAL_ISO15118_ROOT / "iso15118" / "__init__.py").is_file():
         sys.path.insert(0, p)
 
 from iso15118.secc.comm_session_handler import SECCCommunicationSession
-from iso15118.secc.secc_settings import Config
-from iso15118.shared.exi_codec import EXI
-from iso15118.shared.messages.v2gtp import V2GTPMessage
-from iso15118.shared.messages.app_protocol import AppProtocol, SupportedAppProtocolReq
-from iso15118.shared.messages.enums import Namespace, Protocol, ISOV2PayloadTypes
-
-from iso15118.secc.controller.interface import (
-    EVSEControllerInterface,
-    ServiceStatus,
-    SessionStopAction,
-)
 
-
-def _exi_available() -> bool:
-    try:
-        EXI().get_exi_codec()
-        return True
-    except Exception:
-        return False
+from _dummy_evse import DummyEVSEController
+from _sap_fixtures import exi_available, sap_req_bytes, secc_config
 
 
-def _wrap_v2gtp(payload: bytes) -> bytes:
-    return V2GTPMessage(Protocol.UNKNOWN, ISOV2PayloadTypes.EXI_ENCODED, payload).to_bytes()
+# V2GTP header: version, inverse version, payload type, payload length
+_V2GTP_HDR = struct.Struct(">BBHI")
 
 
-def _build_sap_req_bytes() -> bytes:
-    app = AppProtocol(
-        protocol_ns=Protocol.ISO_15118_2.ns.value,
-        major_version=2,
-        minor_version=0,
-        schema_id=1,
-        priority=1,
-    )
-    sap = SupportedAppProtocolReq(app_protocol=[app])
-    payload = EXI().to_exi(sap, Namespace.SAP)
-    return _wrap_v2gtp(payload)
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[bytes, bytes]:
+    hdr = await reader.readexactly(_V2GTP_HDR.size)
+    length = _V2GTP_HDR.unpack_from(hdr)[3]
+    body = await reader.readexactly(length) if length > 0 else b""
+    return hdr, body
 
 
-async def _read_v2gtp(reader: asyncio.StreamReader, timeout: float) -> bytes:
-    hdr = await asyncio.wait_for(reader.readexactly(8), timeout=timeout)
-    length = int.from_bytes(hdr[4:8], "big")
-    body = b""
-    if length > 0:
-        body = await asyncio.wait_for(reader.readexactly(length), timeout=timeout)
-    return hdr + body
+async def _read_v2gtp(reader: asyncio.StreamReader, timeout: float) -> Tuple[bytes, bytes]:
+    # One deadline per frame; (header, body) compare as a pair, so no joined copy
+    return await asyncio.wait_for(_read_frame(reader), timeout=timeout)
 
 
-async def _start_ev_server(host: str, port: int, ready_evt: asyncio.Event, rx_q: asyncio.Queue):
-    sap_bytes = _build_sap_req_bytes()
+async def _start_ev_server(host: str, port: int, ready_evt: asyncio.Event, rx: asyncio.Future):
+    sap_bytes = sap_req_bytes()
 
     async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         try:
@@ -80,13 +61,13 @@ async def _start_ev_server(host: str, port: int, ready_evt: asyncio.Event, rx_q:
             await writer.drain()
             # 2) Read first response
             resp1 = await _read_v2gtp(reader, 2.0)
-            await rx_q.put(resp1)
             # 3) Send duplicate SAP
             writer.write(sap_bytes)
             await writer.drain()
             # 4) Read duplicate response
             resp2 = await _read_v2gtp(reader, 2.0)
-            await rx_q.put(resp2)
+            if not rx.done():
+                rx.set_result((resp1, resp2))
             await asyncio.sleep(0.2)
         except Exception:
             pass
@@ -103,14 +84,15 @@ async def _start_ev_server(host: str, port: int, ready_evt: asyncio.Event, rx_q:
 
 
 async def main():
-    if not _exi_available():
+    if not exi_available():
         print("result: SKIP (EXI codec unavailable)")
         return 0
 
     host = "127.0.0.1"
     ready = asyncio.Event()
-    rx_q: asyncio.Queue = asyncio.Queue()
-    server = await _start_ev_server(host, 0, ready, rx_q)
+    # Resolved once with both SAP responses by the EV server
+    rx: asyncio.Future = asyncio.get_running_loop().create_future()
+    server = await _start_ev_server(host, 0, ready, rx)
     sockets = server.sockets or []
     if not sockets:
         print("Server failed to start")
@@ -119,16 +101,14 @@ async def main():
     await ready.wait()
     try:
         reader, writer = await asyncio.open_connection(host, port)
-        q: asyncio.Queue = asyncio.Queue()
-        cfg = Config()
-        cfg.load_envs(env_path=None)
-        evse = _DummyEVSEController()
+        # The session posts exactly one StopNotification
+        q: asyncio.Queue = asyncio.Queue(maxsize=1)
+        cfg = secc_config()
+        evse = DummyEVSEController()
         secc = SECCCommunicationSession((reader, writer), q, cfg, evse, evse_id="EVSE-TEST-01")
         task = asyncio.create_task(secc.start(timeout=2.0))
-        # Expect two SAP responses to be enqueued in rx_q by the EV server code
-        resp1 = await asyncio.wait_for(rx_q.get(), timeout=5.0)
-        resp2 = await asyncio.wait_for(rx_q.get(), timeout=5.0)
-        ok = resp1 == resp2 and len(resp1) > 0
+        resp1, resp2 = await asyncio.wait_for(rx, timeout=10.0)
+        ok = resp1 == resp2 and len(resp1[1]) > 0
         # Terminate session task
         try:
             await asyncio.wait_for(task, timeout=5.0)
@@ -141,148 +121,7 @@ async def main():
         await server.wait_closed()
 
 
-class _DummyEVSEController(EVSEControllerInterface):
-    async def set_status(self, status: ServiceStatus) -> None:
-        return None
-
-    async def get_evse_id(self, protocol):
-        return "EVSE-TEST-01"
-
-    async def get_supported_energy_transfer_modes(self, protocol):
-        return []
-
-    async def get_schedule_exchange_params(self, *args, **kwargs):
-        return None
-
-    async def get_energy_service_list(self):
-        return None
-
-    def is_eim_authorized(self) -> bool:
-        return True
-
-    async def is_authorized(self, *args, **kwargs):
-        class _Resp:
-            authorization_status = None
-            certificate_response_status = None
-
-        return _Resp()
-
-    async def set_hlc_charging(self, is_ongoing: bool) -> None:
-        return None
-
-    async def update_data_link(self, action: SessionStopAction) -> None:
-        return None
-
-    async def set_present_protocol_state(self, state):
-        return None
-
-    async def get_15118_ev_certificate(self, *args, **kwargs) -> str:
-        return ""
-
-    def ready_to_charge(self) -> bool:
-        return True
-
-    # The rest of abstract methods are unused in this flow and return neutral values
-    async def get_sa_schedule_list(self, *args, **kwargs):
-        return None
-
-    async def get_sa_schedule_list_dinspec(self, *args, **kwargs):
-        return None
-
-    async def get_meter_info_v2(self):
-        return None
-
-    async def get_meter_info_v20(self):
-        return None
-
-    async def get_supported_providers(self):
-        return None
-
-    async def get_cp_state(self):
-        from iso15118.shared.messages.enums import CpState
-
-        return CpState.C2
-
-    async def service_renegotiation_supported(self) -> bool:
-        return False
-
-    async def stop_charger(self) -> None:
-        return None
-
-    async def get_ac_evse_status(self):
-        return None
-
-    async def get_ac_charge_params_v2(self):
-        return None
-
-    async def get_ac_charge_params_v20(self, energy_service=None):
-        return None
-
-    async def get_evse_status(self):
-        return None
-
-    async def is_contactor_closed(self):
-        return None
-
-    async def is_contactor_opened(self) -> bool:
-        return True
-
-    async def get_dc_evse_status(self):
-        return None
-
-    async def get_dc_charge_params_v2(self):
-        return None
-
-    async def get_dc_charge_params_v20(self, energy_service=None):
-        return None
-
-    async def get_dc_charge_parameter_limits_v20(self, *args, **kwargs):
-        return None
-
-    async def get_ac_charge_parameter_limits_v20(self, *args, **kwargs):
-        return None
-
-    async def get_dc_charge_loop_params_v20(self, *args, **kwargs):
-        return None
-
-    async def get_ac_charge_loop_params_v20(self, *args, **kwargs):
-        return None
-
-    async def send_display_params(self):
-        return None
-
-    async def send_rated_limits(self):
-        return None
-
-    async def get_service_parameter_list(self, service_id: int):
-        return None
-
-    async def get_dc_charge_parameters(self):
-        return None
-
-    async def start_cable_check(self):
-        return None
-
-    async def get_cable_check_status(self):
-        return None
-
-    async def send_charging_command(
-        self,
-        evse_present_voltage=None,
-        evse_present_current=None,
-    ):
-        return None
-
-    async def is_evse_current_limit_achieved(self):
-        return False
-
-    async def is_evse_voltage_limit_achieved(self):
-        return False
-
-    async def is_evse_power_limit_achieved(self) -> bool:
-        return False
-
-
 if __name__ == "__main__":
-    raise SystemExit(asyncio.run(main()))
+    # uvloop.run when available (uvloop >= 0.18), else the stdlib loop
+    raise SystemExit(getattr(uvloop, "run", asyncio.run)(main()))
 
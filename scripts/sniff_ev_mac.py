@@ -15,6 +15,9 @@ from __future__ import annotations
 import argparse
 import asyncio
 import binascii
+import ctypes
+import socket
+import struct
 import sys
 from pathlib import Path
 
@@ -30,14 +33,55 @@ except Exception:
     pass
 
 try:
-    from pyslac.layer_2_headers import EthernetHeader, HomePlugHeader
     from pyslac.enums import CM_SLAC_PARM, MMTYPE_REQ, FramesSizes, ETH_TYPE_HPAV
     from pyslac.utils import get_if_hwaddr
-    from pyslac.sockets.async_linux_socket import create_socket, readeth
+    from pyslac.sockets.async_linux_socket import create_socket
 except Exception as e:
     print("Import error: ensure PYTHONPATH includes src/pyslac", e, file=sys.stderr)
     sys.exit(2)
 
+# Same truncation readeth() was called with; the headers fit in 60 bytes
+_RCV_FRAME_SIZE = 60
+# Ethernet dst/src/ethertype, then the HomePlug AV MMV and little-endian
+# MMTYPE right after it; precompiled instead of the pyslac header classes
+_ETH = struct.Struct(">6s6sH")
+_HP = struct.Struct("<BH")
+_HDR_LEN = _ETH.size + _HP.size
+
+# Linux socket option numbers, for Pythons whose socket module lacks them
+SO_ATTACH_FILTER = getattr(socket, "SO_ATTACH_FILTER", 26)
+SO_RCVBUFFORCE = getattr(socket, "SO_RCVBUFFORCE", 33)
+# Classic BPF (code, jt, jf, k): keep the first _RCV_FRAME_SIZE bytes of
+# HomePlug AV frames, drop everything else before it reaches userspace
+_HPAV_BPF = (
+    (0x28, 0, 0, 12),                 # ldh [12]          ; ethertype
+    (0x15, 0, 1, ETH_TYPE_HPAV),      # jeq #0x88E1, jf -> drop
+    (0x06, 0, 0, _RCV_FRAME_SIZE),    # ret #snaplen
+    (0x06, 0, 0, 0),                  # ret #0
+)
+
+
+def _mac_bytes(mac) -> bytes:
+    """Normalize a MAC given as 6 raw bytes or as 'aa:bb:..' text."""
+    if isinstance(mac, str):
+        return bytes.fromhex(mac.replace(":", "").replace("-", ""))
+    return bytes(mac)
+
+
+def _tune_socket(s: socket.socket) -> None:
+    """Best effort: kernel-side HPAV filter and a 1 MiB receive buffer. The
+    Python-side ethertype check stays, so failures only cost speed."""
+    insns = ctypes.create_string_buffer(b"".join(struct.pack("HBBI", *i) for i in _HPAV_BPF))
+    fprog = struct.pack("HP", len(_HPAV_BPF), ctypes.addressof(insns))
+    try:
+        s.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+    except OSError as e:
+        print(f"[sniff] BPF filter not attached ({e}); filtering in Python", file=sys.stderr)
+    try:
+        s.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, 1 << 20)
+    except OSError:
+        pass
+
 
 async def main() -> int:
     ap = argparse.ArgumentParser()
@@ -46,37 +90,59 @@ async def main() -> int:
     args = ap.parse_args()
 
     s = create_socket(args.iface, port=0)
+    s.setblocking(False)
+    _tune_socket(s)
     try:
-        local_mac = get_if_hwaddr(args.iface)
+        local_mac = _mac_bytes(get_if_hwaddr(args.iface))
     except Exception:
         local_mac = None
-    deadline = asyncio.get_event_loop().time() + args.timeout
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + args.timeout
+    # One readiness wakeup per burst: the fd callback only sets the event,
+    # frames are then drained with plain non-blocking recv() until empty
+    readable = asyncio.Event()
+    # One receive buffer for the whole run; frames are parsed in place
+    buf = bytearray(_RCV_FRAME_SIZE)
+    src_view = memoryview(buf)[6:12]
+    loop.add_reader(s.fileno(), readable.set)
     print(f"[sniff] Waiting up to {args.timeout}s on {args.iface} for CM_SLAC_PARM.REQ ...", flush=True)
-    while asyncio.get_event_loop().time() < deadline:
-        try:
-            data = await asyncio.wait_for(readeth(s, args.iface, rcv_frame_size=60), timeout=1.0)
-        except asyncio.TimeoutError:
-            continue
-        try:
-            eth = EthernetHeader.from_bytes(data)
-            hp = HomePlugHeader.from_bytes(data)
-        except Exception:
-            continue
-        # pyslac header uses 'ether_type' naming
-        if getattr(eth, 'ether_type', None) != ETH_TYPE_HPAV:
-            continue
-        # Ignore frames originating from our own interface
-        if local_mac is not None and eth.src_mac == local_mac:
-            continue
-        # Only accept CM_SLAC_PARM.REQ as authoritative EV source
-        if hp.mm_type == (CM_SLAC_PARM | MMTYPE_REQ):
-            ev_mac = ":".join(f"{b:02x}" for b in eth.src_mac)
-            print("[sniff] EV MAC from CM_SLAC_PARM.REQ:", ev_mac)
-            payload = data[14+5:]
-            print("[sniff] CM_SLAC_PARM.REQ payload (hex, first 64B):", binascii.hexlify(payload[:64]).decode())
-            return 0
-        # Otherwise keep waiting for the first CM_SLAC_PARM.REQ
-        # (Avoid reporting potentially misleading HPAV sources.)
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(readable.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            # Clear before draining so a frame landing mid-drain re-arms the event
+            readable.clear()
+            while True:
+                try:
+                    n = s.recv_into(buf)
+                except BlockingIOError:
+                    break
+                # buf is reused, so bytes past n belong to an older frame
+                if n < _HDR_LEN:
+                    continue
+                # Ignore frames originating from our own interface, before parsing
+                if src_view == local_mac:
+                    continue
+                _, src_mac, ether_type = _ETH.unpack_from(buf, 0)
+                _, mm_type = _HP.unpack_from(buf, _ETH.size)
+                if ether_type != ETH_TYPE_HPAV:
+                    continue
+                # Only accept CM_SLAC_PARM.REQ as authoritative EV source
+                if mm_type == (CM_SLAC_PARM | MMTYPE_REQ):
+                    ev_mac = ":".join(f"{b:02x}" for b in src_mac)
+                    print("[sniff] EV MAC from CM_SLAC_PARM.REQ:", ev_mac)
+                    payload = bytes(buf[14+5:n])
+                    print("[sniff] CM_SLAC_PARM.REQ payload (hex, first 64B):", binascii.hexlify(payload[:64]).decode())
+                    return 0
+                # Otherwise keep waiting for the first CM_SLAC_PARM.REQ
+                # (Avoid reporting potentially misleading HPAV sources.)
+    finally:
+        loop.remove_reader(s.fileno())
     print("[sniff] No CM_SLAC_PARM.REQ observed (timeout).", file=sys.stderr)
     return 1
 
@@ -1,57 +1,74 @@
 import time
+from operator import mul
 
 class EnergyMeterSim:
+    # Fixed attribute set, read and written on every orchestrator tick
+    __slots__ = ("start_ns", "last_update_ns", "total_watt_ns", "cum_v_ns", "cum_i_ns", "total_ns")
+
     def __init__(self):
         self.reset()
 
     def reset(self):
         """Initialize or reset the meter readings."""
-        self.total_watt_seconds = 0.0
-        self.start_time = time.time()
-        self.last_update = self.start_time
-        self.total_samples = 0
-        self.cumulative_voltage = 0.0
-        self.cumulative_current = 0.0
+        # Integer monotonic nanoseconds; accumulators are per-nanosecond sums
+        self.start_ns = time.monotonic_ns()
+        self.last_update_ns = self.start_ns
+        self.total_watt_ns = 0.0
+        self.cum_v_ns = 0.0
+        self.cum_i_ns = 0.0
+        self.total_ns = 0
 
     def record_measurement(self, voltage: float, current: float, dt: float):
         """
         Record a new measurement of voltage (V) and current (A) over a time interval dt (sec).
         Accumulate energy and for averaging.
         """
-        # Accumulate energy in watt-seconds (which will be converted to Wh)
-        self.total_watt_seconds += voltage * current * dt
-        # Accumulate for averages
-        self.cumulative_voltage += voltage * dt
-        self.cumulative_current += current * dt
-        self.total_samples += dt  # total time essentially
+        dt_ns = int(dt * 1e9)
+        self.total_watt_ns += voltage * current * dt_ns
+        self.cum_v_ns += voltage * dt_ns
+        self.cum_i_ns += current * dt_ns
+        self.total_ns += dt_ns
+
+    def record_batch(self, voltages, currents, dts):
+        """
+        Record a window of buffered samples (parallel sequences of V, A and dt in sec).
+        Equivalent to calling record_measurement per sample, folded with map/sum.
+        """
+        dt_ns = [int(dt * 1e9) for dt in dts]
+        self.total_watt_ns += sum(map(mul, map(mul, voltages, currents), dt_ns))
+        self.cum_v_ns += sum(map(mul, voltages, dt_ns))
+        self.cum_i_ns += sum(map(mul, currents, dt_ns))
+        self.total_ns += sum(dt_ns)
 
     def update(self, voltage: float, current: float):
         """
-        Convenience method: compute dt from last update, record measurement, and update timestamp.
+        Convenience method: accumulate since the last update and update the timestamp.
         """
-        now = time.time()
-        dt = now - self.last_update
-        if dt < 0:
-            dt = 0
-        self.record_measurement(voltage, current, dt)
-        self.last_update = now
+        # record_measurement inlined; monotonic time never runs backwards
+        now = time.monotonic_ns()
+        dt_ns = now - self.last_update_ns
+        self.total_watt_ns += voltage * current * dt_ns
+        self.cum_v_ns += voltage * dt_ns
+        self.cum_i_ns += current * dt_ns
+        self.total_ns += dt_ns
+        self.last_update_ns = now
 
     def get_total_energy_wh(self) -> float:
-        """Return total energy delivered in Wh (watt-hours)."""
-        return round(self.total_watt_seconds / 3600.0, 3)
+        """Return total energy delivered in Wh (watt-hours), unrounded."""
+        return self.total_watt_ns / 3.6e12
 
     def get_average_voltage(self) -> float:
-        """Return time-weighted average voltage over the session."""
-        if self.total_samples == 0:
+        """Return time-weighted average voltage over the session, unrounded."""
+        if self.total_ns == 0:
             return 0.0
-        return round(self.cumulative_voltage / self.total_samples, 2)
+        return self.cum_v_ns / self.total_ns
 
     def get_average_current(self) -> float:
-        """Return time-weighted average current over the session."""
-        if self.total_samples == 0:
+        """Return time-weighted average current over the session, unrounded."""
+        if self.total_ns == 0:
             return 0.0
-        return round(self.cumulative_current / self.total_samples, 2)
+        return self.cum_i_ns / self.total_ns
 
     def get_session_time(self) -> float:
         """Return total session duration in seconds."""
-        return time.time() - self.start_time
+        return (time.monotonic_ns() - self.start_ns) / 1e9
@@ -1,9 +1,14 @@
 import logging
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import Optional
-import threading
+from typing import Literal, Optional
 import asyncio
+import time
+try:
+    import orjson  # Optional C-accelerated encoder for response bodies
+except ImportError:
+    orjson = None
 from src.hlc.manager import hlc
 from src.hlc.slac import slac as slac_mgr
 try:
@@ -12,14 +17,13 @@ except Exception:
     read_peer = None  # type: ignore
     write_peer = None  # type: ignore
 try:
-    from . import pwm
     from .orchestrator import ChargeOrchestrator
 except ImportError:  # executed from within package root
-    import pwm
     from orchestrator import ChargeOrchestrator
 
 logger = logging.getLogger("api")
-app = FastAPI()
+_JSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+app = FastAPI(default_response_class=_JSONResponse)
 
 # Configure logging if not already configured (use shared util)
 try:
@@ -33,6 +37,15 @@ if _setup_logging:
     _setup_logging()
 orch = ChargeOrchestrator()
 
+
+def _log_body(level: int, msg: str, body: BaseModel) -> None:
+    # Only walk the model when the record will be emitted; model_dump on
+    # pydantic v2, dict() on v1
+    if logger.isEnabledFor(level):
+        dump = getattr(body, "model_dump", None) or body.dict
+        logger.log(level, msg, extra=dump())
+
+
 class StartSessionRequest(BaseModel):
     target_voltage: float = Field(400.0, ge=0, description="Target DC voltage (V)")
     initial_current: float = Field(50.0, ge=0, description="Initial current request (A)")
@@ -40,8 +53,8 @@ class StartSessionRequest(BaseModel):
 
 
 @app.post("/start_session")
-def start_session(body: StartSessionRequest = StartSessionRequest()):
-    logger.info("POST /start_session", extra=body.dict())
+async def start_session(body: StartSessionRequest = StartSessionRequest()):
+    _log_body(logging.INFO, "POST /start_session", body)
     if orch.session_active:
         return {"status": "error", "message": "Session already in progress"}
     started = orch.start_session(
@@ -53,25 +66,98 @@ def start_session(body: StartSessionRequest = StartSessionRequest()):
 
 
 @app.post("/stop_session")
-def stop_session():
+async def stop_session():
     logger.info("POST /stop_session")
     orch.stop_session()
     return {"status": "stopping"}
 
-@app.get("/status")
-def status():
+
+# Read handlers run on the loop; only the parts that may reach HAL I/O
+# (CP/supply/meter reads over serial on ESP adapters) go to a worker thread.
+# The hot polled ones return plain-JSON dicts (str/float/bool/None) in a
+# response directly, skipping FastAPI's jsonable_encoder walk
+@app.get("/status", response_model=None)
+async def status():
     logger.debug("GET /status")
-    return orch.snapshot()
+    return _JSONResponse(await asyncio.to_thread(orch.snapshot))
+
+
+# Pushes never come closer together than this, whatever the client asks for
+STREAM_MIN_INTERVAL_S = 0.05
+
+
+@app.websocket("/stream")
+async def stream(ws: WebSocket, interval_s: float = 1.0):
+    """Push orchestrator snapshots: on every state transition, and every
+    interval_s seconds as a heartbeat."""
+    await ws.accept()
+    interval_s = max(interval_s, STREAM_MIN_INTERVAL_S)
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def _notify():
+        # Runs on orchestrator threads; bursts of transitions collapse into
+        # one pending push
+        loop.call_soon_threadsafe(changed.set)
+
+    async def _until_disconnect():
+        # Inbound messages are ignored; the socket is only read to see it close
+        while (await ws.receive())["type"] != "websocket.disconnect":
+            pass
+        changed.set()
+
+    orch.on_change(_notify)
+    watcher = asyncio.ensure_future(_until_disconnect())
+    try:
+        while not watcher.done():
+            changed.clear()
+            snap = await asyncio.to_thread(orch.snapshot)
+            if orjson is not None:
+                await ws.send_text(orjson.dumps(snap).decode())
+            else:
+                await ws.send_json(snap)
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=interval_s)
+            except asyncio.TimeoutError:
+                pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        orch.remove_listener(_notify)
+        watcher.cancel()
 
 
 class ContactorRequest(BaseModel):
     closed: bool
 
 
+# Seconds a control endpoint waits for the worker to apply its write
+CONTROL_WRITE_TIMEOUT_S = 2.0
+
+
+async def _apply_control(op: str, value) -> Optional[str]:
+    # Control writes are queued for the orchestrator's single control worker,
+    # which applies them in batches; returns an error message, or None once
+    # the write is applied and visible in /status
+    fut = orch.submit_control(op, value)
+    if fut is None:
+        return "control queue full"
+    try:
+        # Shielded so a timeout leaves the worker's future alone
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout=CONTROL_WRITE_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        return "control write timed out"
+    except Exception as e:
+        return str(e)
+    return None
+
+
 @app.post("/control/contactor")
-def control_contactor(body: ContactorRequest):
-    logger.info("POST /control/contactor", extra=body.dict())
-    orch.set_contactor(body.closed)
+async def control_contactor(body: ContactorRequest):
+    _log_body(logging.INFO, "POST /control/contactor", body)
+    err = await _apply_control("contactor", body.closed)
+    if err is not None:
+        return {"status": "error", "message": err}
     return {"status": "ok", "contactor_closed": body.closed}
 
 
@@ -80,32 +166,29 @@ class PWMRequest(BaseModel):
 
 
 @app.post("/control/pwm")
-def control_pwm(body: PWMRequest):
-    logger.info("POST /control/pwm", extra=body.dict())
-    try:
-        orch.set_pwm_duty(body.duty)
-        return {"status": "ok", "duty": body.duty}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+async def control_pwm(body: PWMRequest):
+    _log_body(logging.INFO, "POST /control/pwm", body)
+    err = await _apply_control("pwm", body.duty)
+    if err is not None:
+        return {"status": "error", "message": err}
+    return {"status": "ok", "duty": body.duty}
 
 
 class CPStateRequest(BaseModel):
-    state: str = Field(..., regex=r"^[ABCDE]$")
+    # Literal validates by set membership (no regex run) and works on v1 and v2
+    state: Literal["A", "B", "C", "D", "E"]
 
 
 @app.post("/control/cp_state")
-def control_cp_state(body: CPStateRequest):
-    logger.info("POST /control/cp_state", extra=body.dict())
-    try:
-        orch.set_cp_state(body.state)
-        return {"status": "ok", "state": body.state}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+async def control_cp_state(body: CPStateRequest):
+    _log_body(logging.INFO, "POST /control/cp_state", body)
+    err = await _apply_control("cp_state", body.state)
+    if err is not None:
+        return {"status": "error", "message": err}
+    return {"status": "ok", "state": body.state}
 
 
-@app.get("/cp")
-def cp_status():
-    logger.debug("GET /cp")
+def _read_cp():
     cp = orch.hal.cp()
     try:
         v = float(cp.read_voltage())
@@ -118,50 +201,69 @@ def cp_status():
     return {"voltage_v": v, "state": st}
 
 
-@app.get("/meter")
-def meter():
+def _read_meter():
     m = orch.hal.meter()
     return {
-        "energy_Wh": m.get_energy_Wh(),
-        "avg_voltage": m.get_avg_voltage(),
-        "avg_current": m.get_avg_current(),
+        # Meters return raw floats; rounding happens only here, for output
+        "energy_Wh": round(m.get_energy_Wh(), 3),
+        "avg_voltage": round(m.get_avg_voltage(), 2),
+        "avg_current": round(m.get_avg_current(), 2),
         "session_time_s": round(m.get_session_time_s(), 2),
     }
 
 
-@app.get("/vehicle/bms")
-def vehicle_bms():
+@app.get("/cp", response_model=None)
+async def cp_status():
+    logger.debug("GET /cp")
+    return _JSONResponse(await asyncio.to_thread(_read_cp))
+
+
+@app.get("/meter", response_model=None)
+async def meter():
+    return _JSONResponse(await asyncio.to_thread(_read_meter))
+
+
+# Fallback /vehicle/bms body; the nested dicts are shared by every response
+# (shallow copy per request), so they are never mutated
+_BMS_FALLBACK_TEMPLATE = {
+    "protocol": None,
+    "evcc_id": None,
+    "present_soc": None,
+    "present_voltage": None,
+    "target_voltage": None,
+    "target_current": None,
+    "total_battery_capacity": None,
+    "energy_requests": {"target_energy_request": None, "max_energy_request": None, "min_energy_request": None},
+    "soc_limits": {"min_soc": None, "max_soc": None, "target_soc": None},
+    "rated_limits": {"dc": {}, "ac": {}},
+    "session_limits": {"dc": {}, "ac": {}},
+}
+
+
+@app.get("/vehicle/bms", response_model=None)
+async def vehicle_bms():
     logger.debug("GET /vehicle/bms")
     # Prefer HLC EV data if available, else fall back to orchestrator snapshot
     hlc_bms = hlc.bms_snapshot()
     if hlc_bms:
-        return {"protocol": None, **hlc_bms}
-    snap = orch.snapshot()
-    volts = snap.get("voltage")
+        return _JSONResponse({"protocol": None, **hlc_bms})
+    snap = await asyncio.to_thread(orch.snapshot)
     sp = (snap.get("session_params") or {})
-    return {
-        "protocol": None,
-        "evcc_id": None,
-        "present_soc": None,
-        "present_voltage": volts,
-        "target_voltage": sp.get("target_voltage"),
-        "target_current": sp.get("requested_current"),
-        "total_battery_capacity": None,
-        "energy_requests": {"target_energy_request": None, "max_energy_request": None, "min_energy_request": None},
-        "soc_limits": {"min_soc": None, "max_soc": None, "target_soc": None},
-        "rated_limits": {"dc": {}, "ac": {}},
-        "session_limits": {"dc": {}, "ac": {}},
-    }
+    resp = _BMS_FALLBACK_TEMPLATE.copy()
+    resp["present_voltage"] = snap.get("voltage")
+    resp["target_voltage"] = sp.get("target_voltage")
+    resp["target_current"] = sp.get("requested_current")
+    return _JSONResponse(resp)
 
 
 @app.get("/vehicle/slac")
-def vehicle_slac():
+async def vehicle_slac():
     logger.debug("GET /vehicle/slac")
     st = slac_mgr.status()
     # If API SLAC manager has no info, try to augment from peer store
     try:
         if (not st.get("ev_mac")) and read_peer:
-            peer = read_peer()
+            peer = await asyncio.to_thread(read_peer)
             if peer:
                 st.update({
                     "ev_mac": peer.get("ev_mac"),
@@ -187,7 +289,7 @@ def slac_peer():
 
 
 @app.get("/vehicle/iso15118")
-def vehicle_iso15118():
+async def vehicle_iso15118():
     logger.debug("GET /vehicle/iso15118")
     st = hlc.status()
     return {
@@ -201,25 +303,32 @@ def vehicle_iso15118():
     }
 
 
-@app.get("/vehicle/live")
-def vehicle_live():
+# (orchestrator seq, monotonic time, body) of the last /vehicle/live response;
+# polls within LIVE_TTL_S reuse it instead of re-reading CP, SLAC, HLC and
+# BMS, unless an orchestrator transition (e.g. /control/cp_state) has bumped
+# the seq since
+LIVE_TTL_S = 0.1
+_live_cache = None
+
+
+@app.get("/vehicle/live", response_model=None)
+async def vehicle_live():
     """Aggregate live view for quick debugging: CP, SLAC, ISO and BMS."""
-    cp = orch.hal.cp()
-    try:
-        v = float(cp.read_voltage())
-    except Exception:
-        v = None
-    try:
-        st_cp = cp.get_state()
-    except Exception:
-        st_cp = None
+    global _live_cache
+    seq = orch.state_seq()
+    cached = _live_cache
+    if cached is not None and cached[0] == seq and time.monotonic() - cached[1] < LIVE_TTL_S:
+        return _JSONResponse(cached[2])
+    cp = await asyncio.to_thread(_read_cp)
     hlc_bms = hlc.bms_snapshot() or {}
-    return {
-        "cp": {"voltage_v": v, "state": st_cp},
+    body = {
+        "cp": cp,
         "slac": slac_mgr.status(),
         "iso15118": {"state": (hlc.status() or {}).get("protocol_state")},
         "bms": hlc_bms,
     }
+    _live_cache = (seq, time.monotonic(), body)
+    return _JSONResponse(body)
 
 
 # ESP controls (when using esp-uart HAL)
@@ -280,7 +389,11 @@ class HLCStartRequest(BaseModel):
 
 @app.post("/hlc/start")
 async def hlc_start(body: HLCStartRequest = HLCStartRequest()):
-    logger.info("POST /hlc/start", extra=body.dict())
+    _log_body(logging.INFO, "POST /hlc/start", body)
+    st = hlc.status()
+    # Already starting or running on this iface: nothing to bring up again
+    if st.get("state") in ("starting", "running") and st.get("iface") == body.iface:
+        return {"status": st}
     await hlc.start(body.iface, body.secc_config, body.cert_store)
     return {"status": hlc.status()}
 
@@ -288,12 +401,15 @@ async def hlc_start(body: HLCStartRequest = HLCStartRequest()):
 @app.post("/hlc/stop")
 async def hlc_stop():
     logger.info("POST /hlc/stop")
+    st = hlc.status()
+    if st.get("state") == "stopped":
+        return {"status": st}
     await hlc.stop()
     return {"status": hlc.status()}
 
 
 @app.get("/hlc/status")
-def hlc_status():
+async def hlc_status():
     return hlc.status()
 
 
@@ -316,7 +432,7 @@ def slac_start_matching():
 
 @app.post("/slac/matched")
 async def slac_matched(body: SlacMatchRequest):
-    logger.info("POST /slac/matched", extra=body.dict())
+    _log_body(logging.INFO, "POST /slac/matched", body)
     slac_mgr.matched(body.ev_mac, body.nid, body.run_id, body.attenuation_db)
     # Persist peer info so external clients can read MAC via /slac/peer
     try:
@@ -335,6 +451,6 @@ class FaultRequest(BaseModel):
 
 @app.post("/fault")
 def inject_fault(body: FaultRequest):
-    logger.warning("POST /fault", extra=body.dict())
+    _log_body(logging.WARNING, "POST /fault", body)
     orch.inject_fault(body.type)
     return {"status": "fault_injected", "type": body.type}
@@ -1,9 +1,11 @@
 import os
+import queue
+from concurrent.futures import Future
 import time
 import threading
 import logging
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 try:
     from src.evse_hal.interfaces import EVSEHardware
     from src.evse_hal import registry as hal_registry
@@ -12,12 +14,10 @@ except ImportError:  # executed as part of src.ccs_sim.* package (module path al
     from evse_hal import registry as hal_registry
 try:
     from . import pwm  # package import
-    from .precharge import DCPowerSupplySim, PrechargeSimulator
-    from .emeter import EnergyMeterSim
+    from .precharge import PrechargeSimulator
 except ImportError:  # fallback when executed as a script
     import pwm
-    from precharge import DCPowerSupplySim, PrechargeSimulator
-    from emeter import EnergyMeterSim
+    from precharge import PrechargeSimulator
 
 class Phase(str, Enum):
     IDLE = "IDLE"
@@ -30,6 +30,17 @@ class Phase(str, Enum):
 
 logger = logging.getLogger("orchestrator")
 
+# Control writes from the API are applied by one worker thread in batches
+CONTROL_QUEUE_SIZE = 256
+CONTROL_MAX_BATCH = 32
+# wait_for_vehicle re-reads CP at least this often when the HAL reports CP
+# edges (on_change); without edge reports it polls every 0.5 s
+VEHICLE_WAIT_HEARTBEAT_S = 5.0
+# Charging loop period (s)
+CHARGE_TICK_S = 1.0
+# Polls within one control tick share a snapshot; transitions drop it early
+SNAPSHOT_TTL_S = 0.1
+
 
 class ChargeOrchestrator:
     def __init__(self, hal: Optional[EVSEHardware] = None):
@@ -40,45 +51,92 @@ class ChargeOrchestrator:
             adapter = os.environ.get("EVSE_HAL_ADAPTER", "sim")
             self.hal = hal_registry.create(adapter)
             logger.info("CCS Sim HAL adapter", extra={"adapter": adapter})
-        self.precharger = PrechargeSimulator(self.hal.supply())
+        # Adapters hand out the same driver objects on every call, so resolve
+        # them once instead of per snapshot/tick
+        self._supply = self.hal.supply()
+        self._contactor = self.hal.contactor()
+        self._meter = self.hal.meter()
+        self._cp = self.hal.cp()
+        self._pwm = self.hal.pwm()
+        self.precharger = PrechargeSimulator(self._supply)
+        # Set on CP edges when the HAL CP reader can report them (on_change)
+        self._cp_changed: Optional[threading.Event] = None
+        # Kept so close() can unregister it from a HAL that outlives us
+        self._cp_listener: Optional[Callable[[str], None]] = None
+        on_change = getattr(self._cp, "on_change", None)
+        if callable(on_change):
+            self._cp_changed = threading.Event()
+            self._cp_listener = lambda _state: self._cp_changed.set()
+            on_change(self._cp_listener)
         self.session_active = False
         self.phase: Phase = Phase.IDLE
         self.error: Optional[str] = None
         self._lock = threading.Lock()
         self._stop_event = threading.Event()
-        self._thread: Optional[threading.Thread] = None
         self.last_session_summary: Optional[Dict[str, Any]] = None
+        # (published seq, monotonic time, snapshot) served to polls younger than
+        # SNAPSHOT_TTL_S while the seq is still current
+        self._snap_cache: Optional[Tuple[int, float, Dict[str, Any]]] = None
+        # Called (with no arguments) after every state transition
+        self._listeners: List[Callable[[], None]] = []
         # Session parameters (for diagnostics/BMS-like readout)
         self._session_target_voltage: Optional[float] = None
         self._session_initial_current: Optional[float] = None
         self._session_duration_s: Optional[float] = None
         self._session_requested_current: Optional[float] = None
+        # Session fields as last published by _state_changed(); snapshot()
+        # reads this without taking the lock
+        self._published: Tuple[Dict[str, Any], Optional[Dict[str, Any]], Dict[str, Any]]
+        # Bumped on every publish and reported as snapshot()["seq"], so
+        # pollers can tell whether session state changed since their last read
+        self._snap_seq = 0
+        self._publish()
+        # Bounded queue of (op, value, future) control writes and its single
+        # consumer
+        self._control_q: "queue.Queue[tuple]" = queue.Queue(maxsize=CONTROL_QUEUE_SIZE)
+        self._control_thread = threading.Thread(target=self._control_worker, daemon=True)
+        self._control_thread.start()
+        # One persistent session runner fed (target_voltage, initial_current,
+        # duration_s) tuples; holds at most one start not yet picked up
+        self._session_q: "queue.Queue[tuple]" = queue.Queue(maxsize=1)
+        self._session_thread = threading.Thread(target=self._session_worker, daemon=True)
+        self._session_thread.start()
 
     def wait_for_vehicle(self):
         """
         Wait until a vehicle is detected (CP state B).
         For simulation, this could be triggered externally or by a manual call.
         On real hardware, poll the CP voltage until it drops to ~9V (State B).
+        If the HAL CP reader reports edges, sleep until one arrives instead.
         """
         logger.info("Waiting for vehicle connection (A -> B)...")
+        cp_changed = self._cp_changed
         # Simulation: directly call simulate_cp_state for testing, in real use CP ADC
         while True:
+            # Clear before reading so an edge during the read is not lost
+            if cp_changed is not None:
+                cp_changed.clear()
             voltage = 0.0
             try:
-                voltage = float(self.hal.cp().read_voltage())
+                voltage = float(self._cp.read_voltage())
             except Exception:
                 # Fallback to sim if HAL not available or raises
                 try:
                     voltage = float(pwm.read_cp_voltage())
                 except Exception:
                     voltage = 0.0
-            logger.debug("CP voltage read", extra={"cp_voltage_v": round(voltage, 3)})
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("CP voltage read", extra={"cp_voltage_v": round(voltage, 3)})
             if voltage < 11.0:  # heuristic: below ~11V means a car is present
                 # Enter State B
                 self.session_active = True
+                self._state_changed()
                 logger.info("Vehicle detected (State B)", extra={"cp_voltage_v": round(voltage, 2)})
                 break
-            time.sleep(0.5)
+            if cp_changed is not None:
+                cp_changed.wait(timeout=VEHICLE_WAIT_HEARTBEAT_S)
+            else:
+                time.sleep(0.5)
 
     def run_session(self, target_voltage: float = 400.0, initial_current: float = 50.0, duration_s: float = 10.0):
         """Run a full charging session sequence once a vehicle is connected."""
@@ -92,6 +150,7 @@ class ChargeOrchestrator:
             self._session_initial_current = initial_current
             self._session_duration_s = duration_s
             self._session_requested_current = initial_current
+        self._state_changed()
         # 1. Vehicle detected (state B). Start High-Level Communication (HLC) via PLC.
         # In real scenario, at this point SLAC matching and ISO 15118 session starts.
         logger.info("Starting PLC handshake (SLAC)...")
@@ -100,9 +159,10 @@ class ChargeOrchestrator:
             return self._abort("STOPPED_DURING_HANDSHAKE")
         logger.info("PLC link established. Starting ISO 15118 communication...")
         # Enter State C (vehicle ready) after handshake
-        self.hal.cp().simulate_state("C")  # simulate EV moves to state C (6V)
-        with self._lock:
-            self.phase = Phase.PRECARGE
+        self._cp.simulate_state("C")  # simulate EV moves to state C (6V)
+        # Single-field writes need no lock; _state_changed republishes
+        self.phase = Phase.PRECARGE
+        self._state_changed()
         # 2. Cable check
         logger.info("Performing cable check...")
         # Ensure no voltage on DC lines and connector locked
@@ -119,59 +179,72 @@ class ChargeOrchestrator:
             return self._abort("PRECHARGE_FAILED")
         # Precharge complete, now close contactors (simulate by just assuming they are closed)
         logger.info("Closing contactor and starting energy transfer.")
-        with self._lock:
-            self.hal.contactor().set_closed(True)
-            self.phase = Phase.CHARGING
+        self._contactor.set_closed(True)
+        self.phase = Phase.CHARGING
+        self._state_changed()
         # 4. Charging loop – simulate a simple charging profile
         charging_duration = duration_s  # seconds to simulate charging
-        start_time = time.time()
+        start_time = time.monotonic()
         requested_current = initial_current  # EV initial current request (A)
         self._session_requested_current = requested_current
-        self.hal.supply().set_current_limit(requested_current)
-        while time.time() - start_time < charging_duration:
-            if self._stop_event.is_set():
-                return self._abort("STOP_REQUESTED")
+        # Locals for the loop, plus the sim supply's backing impl resolved once
+        supply = self._supply
+        contactor = self._contactor
+        meter = self._meter
+        impl = getattr(supply, "_impl", None)
+        has_max_current = impl is not None and hasattr(impl, "max_current")
+        supply.set_current_limit(requested_current)
+        # Ticks run on an absolute monotonic schedule (no drift from the time
+        # spent in HAL calls); the one wait per tick also catches stop
+        deadline = start_time + charging_duration
+        next_tick = start_time
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            elapsed = now - start_time
             # Simulate EV updating current request (e.g., ramp down as battery fills)
             # For simplicity, reduce current request over time
-            elapsed = time.time() - start_time
             if elapsed > 5:  # after 5 seconds, simulate tapering current
+                tapered = requested_current != 30.0
                 requested_current = 30.0
-                self.hal.supply().set_current_limit(requested_current)
+                supply.set_current_limit(requested_current)
                 self._session_requested_current = requested_current
+                if tapered:
+                    self._state_changed()
             # EVSE supplies whatever is requested (within limit), so current = requested_current (simulate).
             # We'll simulate that voltage remains near target (battery voltage).
-            self.hal.supply().set_voltage(target_voltage)  # maintain target voltage
+            supply.set_voltage(target_voltage)  # maintain target voltage
             # Simulate measured current from requested if contactor is closed (sim only)
-            if self.hal.contactor().is_closed():
-                s = self.hal.supply()
+            if has_max_current and contactor.is_closed():
                 try:
-                    impl = getattr(s, "_impl", None)
-                    if impl is not None and hasattr(impl, "max_current"):
-                        impl.current = min(requested_current, impl.max_current)
+                    impl.current = min(requested_current, impl.max_current)
                 except Exception:
                     pass
             # Contactor open means no output (simulate by zeroing status)
-            volts, amps = self.hal.supply().get_status()
-            if not self.hal.contactor().is_closed():
+            volts, amps = supply.get_status()
+            if not contactor.is_closed():
                 # Force-zero the supply readings in simulation when the contactor is open
-                try:
-                    s = self.hal.supply()
-                    impl = getattr(s, "_impl", None)
-                    if impl is not None:
-                        setattr(impl, "voltage", 0.0)
-                        setattr(impl, "current", 0.0)
-                except Exception:
-                    pass
+                if impl is not None:
+                    try:
+                        impl.voltage = 0.0
+                        impl.current = 0.0
+                    except Exception:
+                        pass
                 volts, amps = 0.0, 0.0
             # Update energy meter with current measurements
-            self.hal.meter().update(volts, amps)
-            logger.debug("Supply status", extra={"voltage_v": volts, "current_a": amps})
-            if self._wait_or_stop(1.0):
+            meter.update(volts, amps)
+            # Per-tick line: skip building the extra dict unless DEBUG is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Supply status", extra={"voltage_v": volts, "current_a": amps})
+            next_tick += CHARGE_TICK_S
+            if self._wait_or_stop(max(0.0, min(next_tick, deadline) - time.monotonic())):
                 return self._abort("STOP_REQUESTED")
         # 5. Charging complete – simulate EV sending stop request
         logger.info("EV charging complete or stop requested.")
         # Open contactors (simulate instantly)
-        self.hal.cp().simulate_state("B")  # vehicle still present but not charging
+        self._cp.simulate_state("B")  # vehicle still present but not charging
+        self._state_changed()
         self._complete_session()
 
     # Control and utilities
@@ -179,79 +252,209 @@ class ChargeOrchestrator:
         with self._lock:
             if self.session_active:
                 return False
-            self._thread = threading.Thread(target=self.run_session, args=(target_voltage, initial_current, duration_s), daemon=True)
-            self._thread.start()
+            try:
+                self._session_q.put_nowait((target_voltage, initial_current, duration_s))
+            except queue.Full:
+                return False
             return True
 
     def stop_session(self):
         self._stop_event.set()
 
     def set_contactor(self, closed: bool):
-        with self._lock:
-            self.hal.contactor().set_closed(bool(closed))
+        self._contactor.set_closed(bool(closed))
+        self._state_changed()
 
     def set_pwm_duty(self, duty: float):
-        self.hal.pwm().set_duty(duty)
+        self._pwm.set_duty(duty)
+        self._state_changed()
 
     def set_cp_state(self, state: str):
-        self.hal.cp().simulate_state(state)
+        self._cp.simulate_state(state)
+        self._state_changed()
+
+    def submit_control(self, op: str, value: Any) -> Optional[Future]:
+        """Queue a control write ("contactor", "pwm" or "cp_state") for the
+        control worker. Returns a Future that resolves once the write is
+        applied and published (or carries the HAL error), or None when the
+        queue is full."""
+        if op not in self._CONTROL_OPS:
+            raise ValueError(f"Unknown control op: {op}")
+        fut: Future = Future()
+        try:
+            self._control_q.put_nowait((op, value, fut))
+            return fut
+        except queue.Full:
+            return None
+
+    def on_change(self, cb: Callable[[], None]) -> None:
+        """Register cb to be called after each state transition. Callbacks run
+        on the transitioning thread, so they should only hand off (e.g. via
+        loop.call_soon_threadsafe)."""
+        self._listeners.append(cb)
+
+    def remove_listener(self, cb: Callable[[], None]) -> None:
+        try:
+            self._listeners.remove(cb)
+        except ValueError:
+            pass
+
+    def close(self) -> None:
+        """Unregister from the HAL CP reader, for callers that build another
+        orchestrator on the same HAL."""
+        remove = getattr(self._cp, "remove_listener", None)
+        if self._cp_listener is not None and callable(remove):
+            remove(self._cp_listener)
+        self._cp_listener = None
 
     def inject_fault(self, fault_type: str):
-        with self._lock:
-            self.error = fault_type
+        self.error = fault_type
+        self._state_changed()
         self.stop_session()
 
+    def state_seq(self) -> int:
+        """snapshot()["seq"] without the HAL reads: the seq of the currently
+        published view, bumped on every transition."""
+        return self._published[0]["seq"]
+
     def snapshot(self) -> Dict[str, Any]:
+        # Never takes the session lock: session fields come from the view
+        # writers publish on each transition (one attribute read, atomic under
+        # the GIL), and the HAL reads need no lock. A cached snapshot is only
+        # served while its seq still matches the published view, so one built
+        # just before a transition cannot outlive the invalidation
+        state, last_summary, session_params = self._published
+        cached = self._snap_cache
+        if (
+            cached is not None
+            and cached[0] == state["seq"]
+            and time.monotonic() - cached[1] < SNAPSHOT_TTL_S
+        ):
+            return dict(cached[2])
+        volts, amps = self._supply.get_status()
+        closed = self._contactor.is_closed()
+        if not closed:
+            volts, amps = 0.0, 0.0
+        snap = {
+            **state,
+            "contactor_closed": closed,
+            "cp_state": self._cp.get_state(),
+            "voltage": volts,
+            "current": amps,
+            "energy_Wh": round(self._meter.get_energy_Wh(), 3),
+            "time_s": round(self._meter.get_session_time_s(), 1),
+            "last_session_summary": last_summary,
+            "session_params": session_params,
+        }
+        self._snap_cache = (state["seq"], time.monotonic(), snap)
+        return dict(snap)
+
+    # Internal helpers
+    _CONTROL_OPS = {
+        "contactor": lambda self, v: self._contactor.set_closed(bool(v)),
+        "pwm": lambda self, v: self._pwm.set_duty(v),
+        "cp_state": lambda self, v: self._cp.simulate_state(v),
+    }
+
+    def _publish(self):
+        # Built under the lock so concurrent writers cannot publish stale
+        # fields over newer ones; readers only ever see a whole tuple
         with self._lock:
-            volts, amps = self.hal.supply().get_status()
-            if not self.hal.contactor().is_closed():
-                volts, amps = 0.0, 0.0
-            return {
+            self._snap_seq += 1
+            state = {
+                "seq": self._snap_seq,
                 "session_active": self.session_active,
-                "phase": self.phase,
+                # Plain str so encoders take their string fast path
+                "phase": self.phase.value,
                 "error": self.error,
-                "contactor_closed": self.hal.contactor().is_closed(),
-                "cp_state": self.hal.cp().get_state(),
-                "voltage": volts,
-                "current": amps,
-                "energy_Wh": self.hal.meter().get_energy_Wh(),
-                "time_s": round(self.hal.meter().get_session_time_s(), 1),
-                "last_session_summary": self.last_session_summary,
-                "session_params": {
-                    "target_voltage": self._session_target_voltage,
-                    "initial_current": self._session_initial_current,
-                    "duration_s": self._session_duration_s,
-                    "requested_current": self._session_requested_current,
-                },
             }
+            session_params = {
+                "target_voltage": self._session_target_voltage,
+                "initial_current": self._session_initial_current,
+                "duration_s": self._session_duration_s,
+                "requested_current": self._session_requested_current,
+            }
+            self._published = (state, self.last_session_summary, session_params)
+
+    def _state_changed(self):
+        # Publish the new session view, drop the cached snapshot and tell
+        # listeners
+        self._publish()
+        self._snap_cache = None
+        for cb in list(self._listeners):
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def _session_worker(self):
+        while True:
+            args = self._session_q.get()
+            try:
+                self.run_session(*args)
+            except Exception:
+                logger.exception("Session runner failed")
+
+    def _control_worker(self):
+        q = self._control_q
+        while True:
+            batch = [q.get()]
+            while len(batch) < CONTROL_MAX_BATCH:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            # Applied in arrival order. A run of consecutive writes to one
+            # actuator collapses to its last value, except cp_state: every CP
+            # transition must reach simulate_state and its listeners
+            # A collapsed write's future shares the outcome of the one applied
+            ops: List[tuple] = []
+            for op, value, fut in batch:
+                if ops and ops[-1][0] == op and op != "cp_state":
+                    ops[-1] = (op, value, ops[-1][2] + [fut])
+                else:
+                    ops.append((op, value, [fut]))
+            outcomes = []
+            for op, value, futs in ops:
+                try:
+                    self._CONTROL_OPS[op](self, value)
+                    outcomes.append((futs, None))
+                except Exception as e:
+                    logger.warning("Control write failed", extra={"op": op, "value": value, "error": str(e)})
+                    outcomes.append((futs, e))
+            self._state_changed()
+            # Resolved only after publishing, so a caller's next snapshot()
+            # already reflects its write
+            for futs, err in outcomes:
+                for fut in futs:
+                    if err is None:
+                        fut.set_result(None)
+                    else:
+                        fut.set_exception(err)
 
-    # Internal helpers
     def _wait_or_stop(self, seconds: float) -> bool:
-        """Sleep in small intervals, return True if stop_event was set."""
-        end = time.time() + seconds
-        while time.time() < end:
-            if self._stop_event.is_set():
-                return True
-            time.sleep(0.05)
-        return False
+        """Wait up to seconds, return True as soon as stop_event is set."""
+        return self._stop_event.wait(timeout=seconds)
 
     def _abort(self, reason: str):
+        # Open the contactor first; the lock only guards the session fields
+        self._contactor.set_closed(False)
         with self._lock:
             self.error = reason if self.error is None else self.error
             self.phase = Phase.ABORTED
-            self.hal.contactor().set_closed(False)
             self.session_active = False
             # Record summary prior to reset
             self.last_session_summary = self._build_summary()
-            self.hal.meter().reset()
+            self._meter.reset()
+        self._state_changed()
         logger.warning("Session aborted", extra={"reason": self.error})
 
     def _complete_session(self):
         # Log session summary
-        energy = self.hal.meter().get_energy_Wh()
-        avg_v = self.hal.meter().get_avg_voltage()
-        avg_i = self.hal.meter().get_avg_current()
-        duration = self.hal.meter().get_session_time_s()
+        energy = self._meter.get_energy_Wh()
+        avg_v = self._meter.get_avg_voltage()
+        avg_i = self._meter.get_avg_current()
+        duration = self._meter.get_session_time_s()
         logger.info("Session finished")
         logger.info("Session totals", extra={
             "energy_Wh": round(energy, 3),
@@ -259,20 +462,21 @@ class ChargeOrchestrator:
             "avg_current_a": round(avg_i, 2),
             "duration_s": round(duration, 2),
         })
+        self._contactor.set_closed(False)
         with self._lock:
             self.phase = Phase.COMPLETE
-            self.hal.contactor().set_closed(False)
             self.session_active = False
             self.last_session_summary = self._build_summary()
-            self.hal.meter().reset()
+            self._meter.reset()
+        self._state_changed()
 
     def _build_summary(self) -> Dict[str, Any]:
         return {
-            "energy_Wh": self.hal.meter().get_energy_Wh(),
-            "avg_voltage": self.hal.meter().get_avg_voltage(),
-            "avg_current": self.hal.meter().get_avg_current(),
-            "duration_s": round(self.hal.meter().get_session_time_s(), 1),
-            "ended_phase": self.phase,
+            "energy_Wh": round(self._meter.get_energy_Wh(), 3),
+            "avg_voltage": round(self._meter.get_avg_voltage(), 2),
+            "avg_current": round(self._meter.get_avg_current(), 2),
+            "duration_s": round(self._meter.get_session_time_s(), 1),
+            "ended_phase": self.phase.value,
             "error": self.error,
         }
 
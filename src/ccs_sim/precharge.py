@@ -60,10 +60,12 @@ class PrechargeSimulator:
     """
     Controls the pre-charge process: ramping the EVSE output to match EV's voltage, limiting current.
     """
-    def __init__(self, supply):
+    def __init__(self, supply, step_delay_s: float = 0.1):
         # supply: object providing set_voltage(), set_current_limit(), get_status(),
         # and optionally step_towards_voltage(target, step)
+        # step_delay_s: wall time per ramp step; lower it to run the sim faster
         self.supply = supply
+        self.step_delay_s = step_delay_s
         self.precharge_complete = False
 
     def run_precharge(self, target_voltage: float, max_current: float = 2.0, timeout: float = 5.0, stop_event=None):
@@ -73,17 +75,17 @@ class PrechargeSimulator:
         """
         self.precharge_complete = False
         self.supply.set_current_limit(max_current)  # typically 2A
-        start_time = time.time()
+        start = time.monotonic()
+        deadline = start + timeout
+        steps = 0
         logger.info("Precharge start", extra={"target_v": round(target_voltage, 2), "max_current_a": max_current})
         # Choose a dynamic step size so we can realistically reach the target
-        # within the given timeout (10 iterations per second due to the 0.1s sleep)
+        # within the given timeout (one step per step_delay_s, 10 per second by default)
         # Be generous to account for logging overhead in simulation
         step_size = max(1.0, target_voltage / max(timeout * 5.0, 1.0))
         # Loop until voltage nearly reaches target or timeout
-        while time.time() - start_time < timeout:
-            if stop_event is not None and getattr(stop_event, "is_set", lambda: False)():
-                logger.warning("Precharge aborted by stop event")
-                return False
+        while time.monotonic() < deadline:
+            steps += 1
             # Step the supply voltage up towards the target
             if hasattr(self.supply, "step_towards_voltage"):
                 self.supply.step_towards_voltage(target_voltage, step=step_size)
@@ -93,18 +95,27 @@ class PrechargeSimulator:
                 new_voltage = min(target_voltage, volts + step_size)
                 self.supply.set_voltage(new_voltage)
             volts, amps = self.supply.get_status()
-            # Log the status for debugging
-            logger.debug("Precharge step", extra={"voltage_v": volts, "current_a": amps})
+            # Log the status for debugging (extra dict only built at DEBUG)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Precharge step", extra={"voltage_v": volts, "current_a": amps})
             # Check if we've reached target (within a threshold)
             if volts >= target_voltage - 1.0:
                 # Consider precharge done when we're within ~1V of target
                 self.precharge_complete = True
                 break
-            time.sleep(0.1)  # 100 ms step delay to simulate ramp time
+            # Step delay to simulate ramp time; with a stop event the wait
+            # returns as soon as it is set
+            if stop_event is not None:
+                if stop_event.wait(self.step_delay_s):
+                    logger.warning("Precharge aborted by stop event")
+                    return False
+            else:
+                time.sleep(self.step_delay_s)
         if not self.precharge_complete:
             logger.error("Precharge timeout or incomplete")
         else:
-            logger.info("Precharge complete")
+            # One summary line instead of per-step output
+            logger.info("Precharge complete", extra={"elapsed_s": round(time.monotonic() - start, 2), "steps": steps})
         # Reset current limit to full (EVSE can provide more current after precharge)
         try:
             max_curr = getattr(self.supply, "max_current", None)
@@ -1,5 +1,6 @@
 import time
 import math
+import logging
 import threading
 try:
     import RPi.GPIO as GPIO
@@ -19,10 +20,27 @@ ADC_MAX_READING = 1023  # 10-bit ADC
 ADC_REF_V = 3.3       # MCP3008 reference voltage (3.3V)
 CP_DIV_RATIO = 4.0    # Assume CP voltage is divided down 1:4 for ADC (0-12V -> 0-3V)
 
+# MCP3008 single-ended read of CP_ADC_CHANNEL: [start/single/channel, dummy, dummy].
+# xfer2 returns a new list, so the command is built once and reused
+_CP_CMD = [(0b11 << 6) | ((CP_ADC_CHANNEL & 0x07) << 3), 0x0, 0x0]
+# Raw 10-bit reading -> CP line volts
+_CP_SCALE = ADC_REF_V * CP_DIV_RATIO / ADC_MAX_READING
+
+# Ideal CP voltage per simulated state
+_CP_SIM_V = {
+    "A": 12.0,  # 12 V
+    "B": 9.0,   # 9 V (vehicle present, not ready)
+    "C": 6.0,   # 6 V (ready for charging, no ventilation)
+    "D": 3.0,   # 3 V (ready, with ventilation)
+    "E": 0.0,   # 0 V (error)
+}
+
 # Global state for simulation
 _current_duty = 0.0
 _simulated_cp_state = "A"  # Tracks the current CP state in simulation mode
 
+logger = logging.getLogger("pwm")
+
 # Initialize GPIO and PWM (if hardware is available)
 _pwm = None
 if GPIO:
@@ -51,8 +69,7 @@ def set_pwm_duty(duty_percent: float):
     _current_duty = duty_percent
     if _pwm:
         _pwm.ChangeDutyCycle(duty_percent)
-    # If needed, add logging or print for debug:
-    print(f"[CP PWM] Duty set to {duty_percent:.1f}%")
+    logger.debug("CP PWM duty set", extra={"duty_pct": round(duty_percent, 1)})
 
 def read_cp_voltage() -> float:
     """
@@ -60,31 +77,32 @@ def read_cp_voltage() -> float:
     If ADC is not available, returns a simulated voltage based on _simulated_cp_state.
     """
     if _spi:
-        # MCP3008 uses 10-bit readings. We perform an SPI transaction to read channel.
-        # MCP3008 protocol: send start bit, single-ended bit + channel bits, then read 10-bit result.
-        cmd = 0b11 << 6  # start bit (1) + single-ended (1)
-        cmd |= (CP_ADC_CHANNEL & 0x07) << 3
-        # Send 3 bytes: [start/single/channel, dummy, dummy]; receive 3 bytes
-        adc = _spi.xfer2([cmd, 0x0, 0x0])
-        # adc[1] & 0x03 = top 2 bits, adc[2] = lower 8 bits
-        raw_val = ((adc[1] & 0x0F) << 8) | adc[2]
-        voltage = (raw_val / ADC_MAX_READING) * ADC_REF_V * CP_DIV_RATIO
-        return round(voltage, 2)
+        return round(_read_cp_raw() * _CP_SCALE, 2)
     else:
         # Simulation: return ideal voltages for the current CP state
-        state = _simulated_cp_state
-        if state == "A":
-            return 12.0  # 12 V
-        elif state == "B":
-            return 9.0   # 9 V (vehicle present, not ready)
-        elif state == "C":
-            return 6.0   # 6 V (ready for charging, no ventilation)
-        elif state == "D":
-            return 3.0   # 3 V (ready, with ventilation)
-        elif state == "E":
-            return 0.0   # 0 V (error)
-        else:
-            return 12.0  # default to A if unknown
+        # (default to A if unknown)
+        return _CP_SIM_V.get(_simulated_cp_state, 12.0)
+
+def _read_cp_raw() -> int:
+    # MCP3008 protocol: send start bit, single-ended bit + channel bits, then read 10-bit result.
+    # Send 3 bytes: [start/single/channel, dummy, dummy]; receive 3 bytes
+    adc = _spi.xfer2(_CP_CMD)
+    # adc[1] & 0x03 = top 2 bits, adc[2] = lower 8 bits
+    return ((adc[1] & 0x0F) << 8) | adc[2]
+
+
+def read_cp_voltage_burst(n: int = 8) -> float:
+    """
+    Read the CP voltage n times back to back and return the mean (a simple
+    low-pass filter). Falls back to read_cp_voltage() without an ADC.
+    """
+    if not _spi or n <= 1:
+        return read_cp_voltage()
+    # The MCP3008 only starts a conversion on a CS edge, so samples cannot
+    # share one xfer2; each is its own 3-byte transfer, summed as it arrives
+    total = sum(_read_cp_raw() for _ in range(n))
+    return round(total / n * _CP_SCALE, 2)
+
 
 def simulate_cp_state(state: str):
     """
@@ -33,7 +33,7 @@ class _ContactorPeriph(ContactorDriver):
             res = self._c.contactor_set(bool(closed))
             self._last_ok = bool(res.get("ok", False))
             self._last_aux = bool(res.get("aux_ok", False))
-            self._last_ts = time.time()
+            self._last_ts = time.monotonic()
             if closed and not self._last_aux:
                 logger.warning("Contactor aux mismatch; forced open", extra={"res": res})
         except Exception as e:
@@ -47,11 +47,11 @@ class _ContactorPeriph(ContactorDriver):
             aux_ok = bool(res.get("aux_ok", False))
             self._last_ok = aux_ok if commanded else False
             self._last_aux = aux_ok
-            self._last_ts = time.time()
+            self._last_ts = time.monotonic()
             return bool(commanded and aux_ok)
         except Exception:
             # Fall back to last known if recent
-            if (time.time() - self._last_ts) < 2.0 and self._last_ok is not None and self._last_aux is not None:
+            if (time.monotonic() - self._last_ts) < 2.0 and self._last_ok is not None and self._last_aux is not None:
                 return bool(self._last_ok and self._last_aux)
             return False
 
@@ -60,7 +60,7 @@ class _MeterPeriph(Meter):
     def __init__(self, client: EspPeriphClient) -> None:
         self._c = client
         self._last: Optional[MeterSample] = None
-        self._t0 = time.time()
+        self._t0 = time.monotonic()
         # Keep a simple EMA for avg voltage/current
         self._avg_v = 0.0
         self._avg_i = 0.0
@@ -117,10 +117,10 @@ class _MeterPeriph(Meter):
         return float(self._avg_i)
 
     def get_session_time_s(self) -> float:
-        return float(time.time() - self._t0)
+        return float(time.monotonic() - self._t0)
 
     def reset(self) -> None:
-        self._t0 = time.time()
+        self._t0 = time.monotonic()
         self._last = None
         self._avg_v = 0.0
         self._avg_i = 0.0
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Callable, List, Tuple
 
 from ..interfaces import (
     CPReader,
@@ -25,12 +25,30 @@ class _SimPWM(PWMController):
 class _SimCP(CPReader):
     def __init__(self) -> None:
         self._state = "A"
+        self._listeners: List[Callable[[str], None]] = []
+
     def read_voltage(self) -> float:
         return sim_pwm.read_cp_voltage()
 
     def simulate_state(self, state: str) -> None:
         self._state = state
         sim_pwm.simulate_cp_state(state)
+        for cb in list(self._listeners):
+            try:
+                cb(state)
+            except Exception:
+                # One failing listener must not keep the others from the edge
+                pass
+
+    def on_change(self, cb: Callable[[str], None]) -> None:
+        """Register a callback run with the new state on every simulate_state()."""
+        self._listeners.append(cb)
+
+    def remove_listener(self, cb: Callable[[str], None]) -> None:
+        try:
+            self._listeners.remove(cb)
+        except ValueError:
+            pass
 
     def get_state(self) -> str:
         return self._state
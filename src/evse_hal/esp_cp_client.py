@@ -5,8 +5,9 @@ import logging
 import os
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, List, Optional
 
 import serial  # type: ignore
 
@@ -59,6 +60,8 @@ class EspCpClient:
         self._lock = threading.Lock()
         self._conn_lock = threading.RLock()
         self._last: Optional[CPStatus] = None
+        # Recent status frames not yet consumed via get_status_batch (bounded)
+        self._frames: Deque[CPStatus] = deque(maxlen=64)
         self._pong = threading.Event()
         self._err_streak = 0
         self._last_reconnect_ts = 0.0
@@ -114,7 +117,7 @@ class EspCpClient:
 
         Avoid spamming the UART: only poll if cached status is older than a small threshold.
         """
-        deadline = time.time() + wait_s
+        deadline = time.monotonic() + wait_s
         last_ts = self._last.ts if self._last else 0.0
         # Ask for on-demand refresh only if stale. Default threshold ~0.35s (firmware emits ~5Hz)
         try:
@@ -127,7 +130,7 @@ class EspCpClient:
             except Exception:
                 # If TX fails, we'll return the last cached status
                 pass
-        while time.time() < deadline:
+        while time.monotonic() < deadline:
             with self._lock:
                 cur = self._last
             if cur and cur.ts > last_ts:
@@ -136,10 +139,27 @@ class EspCpClient:
         with self._lock:
             return self._last
 
+    def get_status_batch(self, max_n: int = 32, wait_s: float = 0.5) -> List[CPStatus]:
+        """Return all status frames received since the previous batch call.
+
+        Waits (like get_status) for at most wait_s only when nothing is buffered,
+        then drains up to max_n frames oldest-first. Returns an empty list if no
+        new frame arrived in time.
+        """
+        with self._lock:
+            pending = bool(self._frames)
+        if not pending:
+            self.get_status(wait_s=wait_s)
+        out: List[CPStatus] = []
+        with self._lock:
+            while self._frames and len(out) < max_n:
+                out.append(self._frames.popleft())
+        return out
+
     def _wait_status(self, predicate, timeout: float = 1.0) -> Optional[CPStatus]:
         """Wait until predicate(latest_status) is True or timeout expires."""
-        deadline = time.time() + timeout
-        while time.time() < deadline:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
             with self._lock:
                 cur = self._last
             if cur and predicate(cur):
@@ -190,8 +210,8 @@ class EspCpClient:
             self._send({"cmd": "get_status"})
         except Exception:
             return False
-        deadline = time.time() + max(0.1, timeout)
-        while time.time() < deadline:
+        deadline = time.monotonic() + max(0.1, timeout)
+        while time.monotonic() < deadline:
             with self._lock:
                 cur = self._last
             if cur and cur.ts > last_ts:
@@ -303,8 +323,10 @@ class EspCpClient:
                     duty=int(pwm_obj.get("duty", 0)),
                     hz=int(pwm_obj.get("hz", 1000)),
                 )
+                status = CPStatus(cp_mv=mv, state=st, pwm=pwm, ts=time.time(), mode=mode, cp_mv_robust=mv_r)
                 with self._lock:
-                    self._last = CPStatus(cp_mv=mv, state=st, pwm=pwm, ts=time.time(), mode=mode, cp_mv_robust=mv_r)
+                    self._last = status
+                    self._frames.append(status)
             elif mtype == "pong":
                 self._pong.set()
             elif mtype == "ok":
@@ -152,8 +152,8 @@ class EspPeriphClient:
         slot: Dict[str, Any] = {"event": done, "res": None, "err": None}
         self._pending[rid] = slot
         self._send_line(line)
-        deadline = time.time() + max(0.05, timeout)
-        while time.time() < deadline:
+        deadline = time.monotonic() + max(0.05, timeout)
+        while time.monotonic() < deadline:
             if done.wait(timeout=0.05):
                 break
         # Clean up pending
@@ -312,14 +312,14 @@ class EspPeriphClient:
         self._send_line(line)
 
     def cp_get_status(self, wait_s: float = 0.5) -> Optional[CPStatus]:
-        deadline = time.time() + wait_s
+        deadline = time.monotonic() + wait_s
         last_ts = self._cp_last.ts if self._cp_last else 0.0
         # Request on-demand refresh
         try:
             self._send_cp({"cmd": "get_status"})
         except Exception:
             pass
-        while time.time() < deadline:
+        while time.monotonic() < deadline:
             cur = self._cp_last
             if cur and cur.ts > last_ts:
                 return cur
@@ -345,8 +345,8 @@ class EspPeriphClient:
         return None
 
     def _wait_cp(self, predicate, timeout: float = 1.0) -> Optional[CPStatus]:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
             cur = self._cp_last
             if cur and predicate(cur):
                 return cur
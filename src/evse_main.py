@@ -17,8 +17,9 @@ import asyncio
 import logging
 import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 # Ensure local 'src' (this directory) is importable so subpackages like
 # 'util' can be imported as top-level modules when running as a module
@@ -79,6 +80,36 @@ except Exception:
 
 logger = logging.getLogger("evse.main")
 
+# Idle wake-up interval of the HAL CP loop when the CP reader reports edges
+CP_IDLE_HEARTBEAT_S = 1.0
+
+
+@dataclass(frozen=True)
+class CPConfig:
+    """CP-loop timings in seconds; defaults match the env var defaults."""
+
+    stable_before_start_s: float = 0.1
+    disconnect_grace_s: float = 0.5
+    poll_connected_s: float = 0.05
+    poll_emergency_s: float = 0.02
+    lock_verify_timeout_s: float = 1.0
+
+    @classmethod
+    def from_env(cls) -> "CPConfig":
+        def _f(name: str, default: float) -> float:
+            try:
+                return float(os.environ.get(name, default))
+            except ValueError:
+                return default
+
+        return cls(
+            stable_before_start_s=_f("CP_STABLE_BEFORE_START_S", cls.stable_before_start_s),
+            disconnect_grace_s=_f("CP_DISCONNECT_GRACE_S", cls.disconnect_grace_s),
+            poll_connected_s=_f("CP_POLL_CONNECTED_S", cls.poll_connected_s),
+            poll_emergency_s=_f("CP_POLL_EMERGENCY_S", cls.poll_emergency_s),
+            lock_verify_timeout_s=_f("CABLE_LOCK_VERIFY_TIMEOUT_S", cls.lock_verify_timeout_s),
+        )
+
 
 class EVSECommunicationController(SlacSessionController):
     """Handles SLAC matching and starts the ISO 15118 SECC."""
@@ -88,11 +119,24 @@ class EVSECommunicationController(SlacSessionController):
         slac_config: SlacConfig,
         secc_config_path: Optional[str] = None,
         certificate_store: Optional[str] = None,
+        cp_config: Optional[CPConfig] = None,
     ) -> None:
         super().__init__()
         self.slac_config = slac_config
         self.secc_config_path = secc_config_path
         self.certificate_store = certificate_store
+        # HAL-mode CP timings; read from the environment at start() when unset
+        self.cp_config = cp_config
+        # Checked once per HAL-mode CP loop tick; see request_stop()
+        self._stop_requested = False
+        # Set on CP edges when the HAL CP reader can report them (on_change)
+        self._cp_changed: Optional[asyncio.Event] = None
+
+    def request_stop(self) -> None:
+        """Ask the HAL-mode CP loop to stop SECC and return at its next tick."""
+        self._stop_requested = True
+        if self._cp_changed is not None:
+            self._cp_changed.set()
 
     async def notify_matching_ongoing(self, evse_id: str) -> None:  # pragma: no cover - logging
         logger.info("SLAC matching in progress for %s", evse_id)
@@ -138,6 +182,19 @@ class EVSECommunicationController(SlacSessionController):
             return
         connected_states = {"B", "C", "D"}
         emergency_states = {"E", "F"}
+        # Parsed once here instead of on every CP loop tick
+        cp_cfg = self.cp_config or CPConfig.from_env()
+        # Edge source, when offered: while idle the loop then sleeps until the
+        # next CP change instead of polling every base_sleep
+        self._cp_changed = None
+        # Kept so the loop can unregister it on exit
+        cp_listener: Optional[Callable[[str], None]] = None
+        on_change = getattr(hal.cp(), "on_change", None)
+        if callable(on_change):
+            cp_changed = self._cp_changed = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            cp_listener = lambda _state: loop.call_soon_threadsafe(cp_changed.set)  # noqa: E731
+            on_change(cp_listener)
         logger.info("HAL mode: waiting for CP states to start SLAC", extra={"adapter": adapter})
 
         # Lifecycle variables
@@ -198,10 +255,9 @@ class EVSECommunicationController(SlacSessionController):
                 except Exception:
                     pass
                 secc_task.cancel()
-                try:
-                    await asyncio.wait_for(secc_task, timeout=2.0)
-                except Exception:
-                    pass
+                # asyncio.wait rather than wait_for: awaiting the cancelled task
+                # would re-raise its CancelledError here and end the CP loop
+                await asyncio.wait({secc_task}, timeout=2.0)
             finally:
                 secc_task = None
                 secc_handler = None
@@ -232,11 +288,7 @@ class EVSECommunicationController(SlacSessionController):
                 # If lock actuation fails and enforcement is strict, do not proceed
                 return False
             # Verify lock state with timeout
-            try:
-                verify_s = float(os.environ.get("CABLE_LOCK_VERIFY_TIMEOUT_S", "1.0"))
-            except Exception:
-                verify_s = 1.0
-            deadline = asyncio.get_event_loop().time() + max(0.0, verify_s)
+            deadline = asyncio.get_event_loop().time() + max(0.0, cp_cfg.lock_verify_timeout_s)
             while asyncio.get_event_loop().time() < deadline:
                 ok = getattr(lock, "is_locked", lambda: True)()
                 if ok:
@@ -256,324 +308,336 @@ class EVSECommunicationController(SlacSessionController):
                 except Exception:
                     pass
 
-        while True:
-            try:
-                cp = hal.cp().get_state()
-            except Exception:
-                cp = None
-
-            if cp != last_cp:
-                logger.debug("CP transition", extra={"from": last_cp, "to": cp})
-                last_cp = cp
-                # If a SLAC session is active, forward CP transitions promptly
-                if session is not None and cp is not None:
-                    # Map HAL letters to SLAC controller states (D treated as C)
-                    slac_cp = "C" if cp in {"C", "D"} else (cp if cp in {"A", "B"} else None)
-                    if slac_cp and slac_cp != last_slac_cp_forwarded:
-                        try:
-                            await self.process_cp_state(session, slac_cp)
-                            last_slac_cp_forwarded = slac_cp
-                        except Exception:
-                            pass
-
-            # Emergency states: cut power and unlock immediately
-            if cp in emergency_states:
+        self._stop_requested = False
+        try:
+            while True:
+                if self._stop_requested:
+                    await _stop_secc("stop requested")
+                    logger.info("HAL CP loop stopped on request")
+                    return
+                # Cleared before the read so an edge after it still wakes the idle wait
+                if self._cp_changed is not None:
+                    self._cp_changed.clear()
                 try:
-                    hal.contactor().set_closed(False)
+                    cp = hal.cp().get_state()
                 except Exception:
-                    pass
-                await _unlock_cable_best_effort("cp_emergency")
-                # Stop SECC quickly
-                if secc_task is not None:
-                    await _stop_secc("CP emergency state")
-                # Reset any SLAC session state
-                if session is not None:
+                    cp = None
+
+                if cp != last_cp:
+                    logger.debug("CP transition", extra={"from": last_cp, "to": cp})
+                    last_cp = cp
+                    # If a SLAC session is active, forward CP transitions promptly
+                    if session is not None and cp is not None:
+                        # Map HAL letters to SLAC controller states (D treated as C)
+                        slac_cp = "C" if cp in {"C", "D"} else (cp if cp in {"A", "B"} else None)
+                        if slac_cp and slac_cp != last_slac_cp_forwarded:
+                            try:
+                                await self.process_cp_state(session, slac_cp)
+                                last_slac_cp_forwarded = slac_cp
+                            except Exception:
+                                pass
+
+                # Emergency states: cut power and unlock immediately
+                if cp in emergency_states:
                     try:
-                        await self.process_cp_state(session, "A")
+                        hal.contactor().set_closed(False)
                     except Exception:
                         pass
+                    await _unlock_cable_best_effort("cp_emergency")
+                    # Stop SECC quickly
+                    if secc_task is not None:
+                        await _stop_secc("CP emergency state")
+                    # Reset any SLAC session state
+                    if session is not None:
+                        try:
+                            await self.process_cp_state(session, "A")
+                        except Exception:
+                            pass
+                        try:
+                            await session.leave_logical_network()
+                        except Exception:
+                            pass
+                        session = None
+                        session_started_at = 0.0
+                        slac_attempts = 0
+                    # Hint firmware CP to safe if available
                     try:
-                        await session.leave_logical_network()
+                        getattr(hal, "esp_set_mode", lambda _m=None: None)("manual")
+                        getattr(hal, "esp_set_pwm", lambda _d, enable=True: None)(100, True)
                     except Exception:
                         pass
-                    session = None
-                    session_started_at = 0.0
-                    slac_attempts = 0
-                # Hint firmware CP to safe if available
-                try:
-                    getattr(hal, "esp_set_mode", lambda _m=None: None)("manual")
-                    getattr(hal, "esp_set_pwm", lambda _d, enable=True: None)(100, True)
-                except Exception:
-                    pass
-                # Restore dc mode so CP reports 5% duty when reconnected
-                try:
-                    getattr(hal, "esp_set_mode", lambda _m=None: None)("dc")
-                except Exception:
-                    pass
-                # Allow fresh SetKey on next connection
-                keyed_once = False
-
-            elif cp in connected_states:
-                if session is None:
-                    if slac_attempts >= max_slac_attempts:
-                        # Exhausted attempts; wait for CP disconnect or manual retry
-                        if int(asyncio.get_event_loop().time() * 10) % 10 == 0:
-                            logger.warning(
-                                "SLAC attempts exhausted (max=%d); holding until CP disconnect",
-                                max_slac_attempts,
-                            )
-                        await asyncio.sleep(0.5)
-                        continue
-                    # Ensure plug is fully seated and (optionally) locked before PLC
-                    # Small stability wait for CP to avoid starting on a glitch
+                    # Restore dc mode so CP reports 5% duty when reconnected
                     try:
-                        stable_s = float(os.environ.get("CP_STABLE_BEFORE_START_S", "0.1"))
+                        getattr(hal, "esp_set_mode", lambda _m=None: None)("dc")
                     except Exception:
-                        stable_s = 0.1
-                    if stable_s > 0:
-                        t0 = asyncio.get_event_loop().time()
-                        ok = True
-                        while asyncio.get_event_loop().time() - t0 < stable_s:
-                            try:
-                                if hal.cp().get_state() not in connected_states:
-                                    ok = False
-                                    break
-                            except Exception:
-                                ok = False
-                                break
-                            await asyncio.sleep(0.02)
-                        if not ok:
-                            await asyncio.sleep(0.05)
-                            continue
+                        pass
+                    # Allow fresh SetKey on next connection
+                    keyed_once = False
 
-                    # Try to engage cable lock if present/enforced
-                    locked_ok = await _ensure_locked_before_plc()
-                    if not locked_ok:
-                        logger.warning("Cable lock not confirmed; deferring PLC start")
-                        await asyncio.sleep(0.2)
-                        continue
-
-                    logger.info("Vehicle detected via CP", extra={"cp_state": cp})
-                    session = SlacEvseSession(evse_id, iface, self.slac_config)
-                    # Reset forwarded CP marker for the new session
-                    last_slac_cp_forwarded = None
-                    if not keyed_once:
-                        # Avoid hammering SetKey; apply a small backoff between attempts
-                        now = asyncio.get_event_loop().time()
-                        if (now - last_setkey_ts) >= max(0.0, setkey_backoff_s):
-                            last_setkey_ts = now
-                            try:
-                                await session.evse_set_key()
-                                keyed_once = True
-                                logger.info("CM_SET_KEY succeeded")
-                            except Exception as e:
-                                # Keep keyed_once False so we retry on next loop
+                elif cp in connected_states:
+                    if session is None:
+                        if slac_attempts >= max_slac_attempts:
+                            # Exhausted attempts; wait for CP disconnect or manual retry
+                            if int(asyncio.get_event_loop().time() * 10) % 10 == 0:
                                 logger.warning(
-                                    "CM_SET_KEY failed; will retry",
-                                    extra={"error": str(e)},
+                                    "SLAC attempts exhausted (max=%d); holding until CP disconnect",
+                                    max_slac_attempts,
                                 )
-                    await self.process_cp_state(session, "B")
-                    last_slac_cp_forwarded = "B"
-                    await asyncio.sleep(0.2)
-                    cur = hal.cp().get_state()
-                    if cur in {"C", "D"}:
-                        await self.process_cp_state(session, "C")
-                        last_slac_cp_forwarded = "C"
-                    session_started_at = asyncio.get_event_loop().time()
-
-                if session and session.state == STATE_MATCHED and secc_task is None:
-                    try:
-                        self._log_slac_peer(session)
-                    except Exception:
-                        pass
-                    await _start_secc_bg()
-
-                if session and session.state != STATE_MATCHED:
-                    # No-op here; CM_SET_KEY already handled above with backoff
-                    # Proactive nudge if we appear stuck in CP=B after initial setup
-                    try:
-                        now = asyncio.get_event_loop().time()
-                        if cp == "B" and session_started_at > 0 and (now - session_started_at) >= max(0.0, first_nudge_s):
-                            if (now - last_nudge_ts) >= max(0.0, nudge_every_s):
+                            await asyncio.sleep(0.5)
+                            continue
+                        # Ensure plug is fully seated and (optionally) locked before PLC
+                        # Small stability wait for CP to avoid starting on a glitch
+                        stable_s = cp_cfg.stable_before_start_s
+                        if stable_s > 0:
+                            t0 = asyncio.get_event_loop().time()
+                            ok = True
+                            while asyncio.get_event_loop().time() - t0 < stable_s:
                                 try:
-                                    reset_ms = int(os.environ.get("SLAC_RESTART_HINT_MS", "400"))
+                                    if hal.cp().get_state() not in connected_states:
+                                        ok = False
+                                        break
                                 except Exception:
-                                    reset_ms = 400
+                                    ok = False
+                                    break
+                                await asyncio.sleep(0.02)
+                            if not ok:
+                                await asyncio.sleep(0.05)
+                                continue
+
+                        # Try to engage cable lock if present/enforced
+                        locked_ok = await _ensure_locked_before_plc()
+                        if not locked_ok:
+                            logger.warning("Cable lock not confirmed; deferring PLC start")
+                            await asyncio.sleep(0.2)
+                            continue
+
+                        logger.info("Vehicle detected via CP", extra={"cp_state": cp})
+                        session = SlacEvseSession(evse_id, iface, self.slac_config)
+                        # Reset forwarded CP marker for the new session
+                        last_slac_cp_forwarded = None
+                        if not keyed_once:
+                            # Avoid hammering SetKey; apply a small backoff between attempts
+                            now = asyncio.get_event_loop().time()
+                            if (now - last_setkey_ts) >= max(0.0, setkey_backoff_s):
+                                last_setkey_ts = now
                                 try:
-                                    getattr(hal, "restart_slac_hint", lambda _ms=None: None)(reset_ms)
-                                    last_nudge_ts = now
-                                    logger.info("HAL SLAC proactive nudge", extra={"reset_ms": reset_ms})
-                                except Exception:
-                                    pass
-                    except Exception:
-                        pass
-                    # Keep SLAC session informed of steady-state CP even if it hasn't changed recently
-                    try:
-                        slac_cp = (
-                            "C" if cp in {"C", "D"} else (cp if cp in {"A", "B"} else None)
-                        )
-                        if session is not None and slac_cp and slac_cp != last_slac_cp_forwarded:
-                            await self.process_cp_state(session, slac_cp)
-                            last_slac_cp_forwarded = slac_cp
-                    except Exception:
-                        pass
-                    # If EV MAC is known (after SLAC_PARM), log once early
-                    try:
-                        if not ev_peer_logged and getattr(session, "pev_mac", None):
+                                    await session.evse_set_key()
+                                    keyed_once = True
+                                    logger.info("CM_SET_KEY succeeded")
+                                except Exception as e:
+                                    # Keep keyed_once False so we retry on next loop
+                                    logger.warning(
+                                        "CM_SET_KEY failed; will retry",
+                                        extra={"error": str(e)},
+                                    )
+                        await self.process_cp_state(session, "B")
+                        last_slac_cp_forwarded = "B"
+                        await asyncio.sleep(0.2)
+                        cur = hal.cp().get_state()
+                        if cur in {"C", "D"}:
+                            await self.process_cp_state(session, "C")
+                            last_slac_cp_forwarded = "C"
+                        session_started_at = asyncio.get_event_loop().time()
+
+                    if session and session.state == STATE_MATCHED and secc_task is None:
+                        try:
                             self._log_slac_peer(session)
-                            ev_peer_logged = True
-                    except Exception:
-                        pass
-                    elapsed = asyncio.get_event_loop().time() - session_started_at
-                    env_wait = os.environ.get("SLAC_WAIT_TIMEOUT_S")
-                    timeout_s = (
-                        float(env_wait)
-                        if env_wait is not None
-                        else float(self.slac_config.slac_init_timeout or 50.0)
-                    )
-                    if elapsed > timeout_s:
-                        slac_attempts += 1
-                        logger.warning(
-                            "SLAC match timeout (attempt %d/%d); applying restart hint",
-                            slac_attempts,
-                            max_slac_attempts,
-                        )
+                        except Exception:
+                            pass
+                        await _start_secc_bg()
+
+                    if session and session.state != STATE_MATCHED:
+                        # No-op here; CM_SET_KEY already handled above with backoff
+                        # Proactive nudge if we appear stuck in CP=B after initial setup
+                        try:
+                            now = asyncio.get_event_loop().time()
+                            if cp == "B" and session_started_at > 0 and (now - session_started_at) >= max(0.0, first_nudge_s):
+                                if (now - last_nudge_ts) >= max(0.0, nudge_every_s):
+                                    try:
+                                        reset_ms = int(os.environ.get("SLAC_RESTART_HINT_MS", "400"))
+                                    except Exception:
+                                        reset_ms = 400
+                                    try:
+                                        getattr(hal, "restart_slac_hint", lambda _ms=None: None)(reset_ms)
+                                        last_nudge_ts = now
+                                        logger.info("HAL SLAC proactive nudge", extra={"reset_ms": reset_ms})
+                                    except Exception:
+                                        pass
+                        except Exception:
+                            pass
+                        # Keep SLAC session informed of steady-state CP even if it hasn't changed recently
                         try:
-                            reset_ms = int(os.environ.get("SLAC_RESTART_HINT_MS", "400"))
-                            getattr(hal, "restart_slac_hint", lambda _ms=None: None)(reset_ms)
-                            logger.info(
-                                "HAL SLAC restart hint requested",
-                                extra={"reset_ms": reset_ms, "iface": iface, "timeout_s": timeout_s},
+                            slac_cp = (
+                                "C" if cp in {"C", "D"} else (cp if cp in {"A", "B"} else None)
                             )
+                            if session is not None and slac_cp and slac_cp != last_slac_cp_forwarded:
+                                await self.process_cp_state(session, slac_cp)
+                                last_slac_cp_forwarded = slac_cp
                         except Exception:
                             pass
-                        # Gracefully reset SLAC state on the current session
+                        # If EV MAC is known (after SLAC_PARM), log once early
                         try:
-                            await self.process_cp_state(session, "A")
+                            if not ev_peer_logged and getattr(session, "pev_mac", None):
+                                self._log_slac_peer(session)
+                                ev_peer_logged = True
                         except Exception:
                             pass
-                        session = None
-                        session_started_at = 0.0
-                        # If attempts remain, back off briefly before next try
-                        if slac_attempts < max_slac_attempts:
+                        elapsed = asyncio.get_event_loop().time() - session_started_at
+                        env_wait = os.environ.get("SLAC_WAIT_TIMEOUT_S")
+                        timeout_s = (
+                            float(env_wait)
+                            if env_wait is not None
+                            else float(self.slac_config.slac_init_timeout or 50.0)
+                        )
+                        if elapsed > timeout_s:
+                            slac_attempts += 1
+                            logger.warning(
+                                "SLAC match timeout (attempt %d/%d); applying restart hint",
+                                slac_attempts,
+                                max_slac_attempts,
+                            )
                             try:
-                                await asyncio.sleep(slac_retry_backoff_s)
+                                reset_ms = int(os.environ.get("SLAC_RESTART_HINT_MS", "400"))
+                                getattr(hal, "restart_slac_hint", lambda _ms=None: None)(reset_ms)
+                                logger.info(
+                                    "HAL SLAC restart hint requested",
+                                    extra={"reset_ms": reset_ms, "iface": iface, "timeout_s": timeout_s},
+                                )
                             except Exception:
                                 pass
-                        else:
-                            # Too many failures; optionally auto-restart matching without requiring a disconnect
-                            auto_restart = os.environ.get("SLAC_AUTO_RESTART", "1").strip().lower() not in ("0", "false", "no")
-                            if auto_restart and (cp in connected_states):
-                                logger.warning(
-                                    "SLAC failed after %d attempts; auto-restarting after backoff",
-                                    slac_attempts,
-                                )
-                                # Proactive nudge before retrying
-                                try:
-                                    reset_ms = int(os.environ.get("SLAC_RESTART_HINT_MS", "400"))
-                                except Exception:
-                                    reset_ms = 400
-                                try:
-                                    getattr(hal, "restart_slac_hint", lambda _ms=None: None)(reset_ms)
-                                    logger.info("HAL SLAC proactive nudge (auto-restart)", extra={"reset_ms": reset_ms})
-                                except Exception:
-                                    pass
-                                # Reset attempt counter and wait before next try
-                                slac_attempts = 0
+                            # Gracefully reset SLAC state on the current session
+                            try:
+                                await self.process_cp_state(session, "A")
+                            except Exception:
+                                pass
+                            session = None
+                            session_started_at = 0.0
+                            # If attempts remain, back off briefly before next try
+                            if slac_attempts < max_slac_attempts:
                                 try:
-                                    await asyncio.sleep(max(0.2, slac_retry_backoff_s))
+                                    await asyncio.sleep(slac_retry_backoff_s)
                                 except Exception:
                                     pass
-                                session_started_at = 0.0
-                                session = None
-                                continue
                             else:
-                                # Surface an error and wait for CP disconnect/replug
-                                logger.error(
-                                    "SLAC initialization failed after %d attempts; waiting for CP disconnect/retry",
-                                    slac_attempts,
-                                )
-                                # Block further attempts until CP disconnect resets the counter
-            else:
-                # Safety first: immediately open contactor on CP disconnect
-                # (host-side cutoff). Default 100 ms to align with IEC 61851.
-                try:
-                    cutoff_s = float(os.environ.get("SECC_CP_DISCONNECT_IMMEDIATE_CUTOFF_S", "0.1"))
-                except Exception:
-                    cutoff_s = 0.1
-                if cutoff_s > 0:
-                    try:
-                        hal.contactor().set_closed(False)
-                        # Attempt to drive CP to a safe state as a hardware hint
-                        getattr(hal, "esp_set_mode", lambda _m=None: None)("manual")
-                        getattr(hal, "esp_set_pwm", lambda _d, enable=True: None)(100, True)
-                    except Exception:
-                        pass
-                    # Unlock promptly so user can remove connector
-                    await _unlock_cable_best_effort("cp_disconnect")
-                    # Short delay to satisfy timing without unduly delaying logic
+                                # Too many failures; optionally auto-restart matching without requiring a disconnect
+                                auto_restart = os.environ.get("SLAC_AUTO_RESTART", "1").strip().lower() not in ("0", "false", "no")
+                                if auto_restart and (cp in connected_states):
+                                    logger.warning(
+                                        "SLAC failed after %d attempts; auto-restarting after backoff",
+                                        slac_attempts,
+                                    )
+                                    # Proactive nudge before retrying
+                                    try:
+                                        reset_ms = int(os.environ.get("SLAC_RESTART_HINT_MS", "400"))
+                                    except Exception:
+                                        reset_ms = 400
+                                    try:
+                                        getattr(hal, "restart_slac_hint", lambda _ms=None: None)(reset_ms)
+                                        logger.info("HAL SLAC proactive nudge (auto-restart)", extra={"reset_ms": reset_ms})
+                                    except Exception:
+                                        pass
+                                    # Reset attempt counter and wait before next try
+                                    slac_attempts = 0
+                                    try:
+                                        await asyncio.sleep(max(0.2, slac_retry_backoff_s))
+                                    except Exception:
+                                        pass
+                                    session_started_at = 0.0
+                                    session = None
+                                    continue
+                                else:
+                                    # Surface an error and wait for CP disconnect/replug
+                                    logger.error(
+                                        "SLAC initialization failed after %d attempts; waiting for CP disconnect/retry",
+                                        slac_attempts,
+                                    )
+                                    # Block further attempts until CP disconnect resets the counter
+                else:
+                    # Safety first: immediately open contactor on CP disconnect
+                    # (host-side cutoff). Default 100 ms to align with IEC 61851.
                     try:
-                        await asyncio.sleep(min(cutoff_s, 0.2))
+                        cutoff_s = float(os.environ.get("SECC_CP_DISCONNECT_IMMEDIATE_CUTOFF_S", "0.1"))
                     except Exception:
-                        pass
-                    # Restore dc mode so EV sees 5% duty once reconnected
-                    try:
-                        getattr(hal, "esp_set_mode", lambda _m=None: None)("dc")
-                    except Exception:
-                        pass
-                # Grace window to tolerate brief CP flaps before tearing down SECC
-                grace_s = float(os.environ.get("CP_DISCONNECT_GRACE_S", "0.5"))
-                if grace_s > 0:
-                    await asyncio.sleep(grace_s)
-                    try:
-                        cp2 = hal.cp().get_state()
-                    except Exception:
-                        cp2 = None
-                    if cp2 in connected_states:
-                        # still connected; continue
-                        await asyncio.sleep(0.1)
-                        continue
-                if secc_task is not None:
-                    await _stop_secc("CP state not connected")
-                if session is not None:
+                        cutoff_s = 0.1
+                    if cutoff_s > 0:
+                        try:
+                            hal.contactor().set_closed(False)
+                            # Attempt to drive CP to a safe state as a hardware hint
+                            getattr(hal, "esp_set_mode", lambda _m=None: None)("manual")
+                            getattr(hal, "esp_set_pwm", lambda _d, enable=True: None)(100, True)
+                        except Exception:
+                            pass
+                        # Unlock promptly so user can remove connector
+                        await _unlock_cable_best_effort("cp_disconnect")
+                        # Short delay to satisfy timing without unduly delaying logic
+                        try:
+                            await asyncio.sleep(min(cutoff_s, 0.2))
+                        except Exception:
+                            pass
+                        # Restore dc mode so EV sees 5% duty once reconnected
+                        try:
+                            getattr(hal, "esp_set_mode", lambda _m=None: None)("dc")
+                        except Exception:
+                            pass
+                    # Grace window to tolerate brief CP flaps before tearing down SECC
+                    grace_s = cp_cfg.disconnect_grace_s
+                    if grace_s > 0:
+                        await asyncio.sleep(grace_s)
+                        try:
+                            cp2 = hal.cp().get_state()
+                        except Exception:
+                            cp2 = None
+                        if cp2 in connected_states:
+                            # still connected; continue
+                            await asyncio.sleep(0.1)
+                            continue
+                    if secc_task is not None:
+                        await _stop_secc("CP state not connected")
+                    if session is not None:
+                        try:
+                            await self.process_cp_state(session, "A")
+                        except Exception:
+                            pass
+                        try:
+                            await session.leave_logical_network()
+                        except Exception:
+                            pass
+                        session = None
+                        session_started_at = 0.0
+                        # Reset SLAC attempts on disconnect (fresh start on next plug-in)
+                        slac_attempts = 0
+                        keyed_once = False
+                    # Optional: nudge SLAC reset hint on disconnect
                     try:
-                        await self.process_cp_state(session, "A")
+                        ms = int(os.environ.get("SLAC_RESTART_ON_DISCONNECT_MS", "0"))
+                        if ms > 0:
+                            getattr(hal, "restart_slac_hint", lambda _ms=None: None)(ms)
+                            logger.info("HAL SLAC restart hint on disconnect", extra={"reset_ms": ms})
                     except Exception:
                         pass
+
+                # Adaptive polling: faster while connected/charging to cut latency
+                base_sleep = 0.2
+                if cp in emergency_states:
+                    await asyncio.sleep(max(0.0, cp_cfg.poll_emergency_s))
+                elif cp in connected_states or (secc_task is not None):
+                    await asyncio.sleep(max(0.0, cp_cfg.poll_connected_s))
+                elif self._cp_changed is not None:
+                    # Idle: wake on the next CP edge, with a slow heartbeat
                     try:
-                        await session.leave_logical_network()
-                    except Exception:
+                        await asyncio.wait_for(self._cp_changed.wait(), timeout=CP_IDLE_HEARTBEAT_S)
+                    except asyncio.TimeoutError:
                         pass
-                    session = None
-                    session_started_at = 0.0
-                    # Reset SLAC attempts on disconnect (fresh start on next plug-in)
-                    slac_attempts = 0
-                    keyed_once = False
-                # Optional: nudge SLAC reset hint on disconnect
-                try:
-                    ms = int(os.environ.get("SLAC_RESTART_ON_DISCONNECT_MS", "0"))
-                    if ms > 0:
-                        getattr(hal, "restart_slac_hint", lambda _ms=None: None)(ms)
-                        logger.info("HAL SLAC restart hint on disconnect", extra={"reset_ms": ms})
-                except Exception:
-                    pass
-
-            # Adaptive polling: faster while connected/charging to cut latency
-            base_sleep = 0.2
-            try:
-                fast_connected = float(os.environ.get("CP_POLL_CONNECTED_S", "0.05"))
-            except Exception:
-                fast_connected = 0.05
-            try:
-                fastest_emergency = float(os.environ.get("CP_POLL_EMERGENCY_S", "0.02"))
-            except Exception:
-                fastest_emergency = 0.02
-            if cp in emergency_states:
-                await asyncio.sleep(max(0.0, fastest_emergency))
-            elif cp in connected_states or (secc_task is not None):
-                await asyncio.sleep(max(0.0, fast_connected))
-            else:
-                await asyncio.sleep(base_sleep)
+                else:
+                    await asyncio.sleep(base_sleep)
+        finally:
+            # Unregister so a restarted loop or a later controller on the same
+            # HAL does not leave this closed-over loop behind as a listener
+            if cp_listener is not None:
+                remove = getattr(hal.cp(), "remove_listener", None)
+                if callable(remove):
+                    remove(cp_listener)
+            self._cp_changed = None
 
     async def _trigger_matching(self, session: SlacEvseSession) -> None:
         """Simulate CP state transitions to start SLAC and wait for a match."""
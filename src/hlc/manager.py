@@ -27,29 +27,26 @@ class HLCManager:
     async def start(self, iface: str, secc_config_path: Optional[str] = None, certificate_store: Optional[str] = None) -> None:
         if self._task and not self._task.done():
             return
+        if self._status.state == "starting":
+            return
         if certificate_store:
             os.environ["PKI_PATH"] = certificate_store
         self._status = HLCStatus(state="starting", iface=iface)
 
-        # Lazy imports to avoid iso15118 package import at module load time
+        # The first iso15118 import, HAL bring-up (serial open on ESP adapters)
+        # and the config file load all block, so they run off the event loop
         try:
-            from src.evse_hal.iso15118_hal_controller import HalEVSEController
-            from iso15118.secc import SECCHandler
-            from iso15118.secc.secc_settings import Config as SeccConfig
-            from iso15118.shared.exi_codec import ExificientEXICodec
-        except Exception as e:
+            SECCHandler, ExificientEXICodec, config = await asyncio.to_thread(
+                self._prepare, iface, secc_config_path
+            )
+        except ImportError as e:
             self._status.state = "error"
             self._status.error = f"import_error: {e}"
             return
-
-        # Select HAL adapter based on environment (default 'sim').
-        adapter = os.environ.get("EVSE_HAL_ADAPTER", "sim")
-        hal = create_hal(adapter)
-        self._controller = HalEVSEController(hal)
-
-        config = SeccConfig()
-        config.load_envs(secc_config_path)
-        config.iface = iface
+        except Exception as e:
+            self._status.state = "error"
+            self._status.error = str(e)
+            raise
 
         async def _run():
             try:
@@ -66,6 +63,23 @@ class HLCManager:
         loop = asyncio.get_event_loop()
         self._task = loop.create_task(_run())
 
+    def _prepare(self, iface: str, secc_config_path: Optional[str]):
+        # Lazy imports to avoid iso15118 package import at module load time
+        from src.evse_hal.iso15118_hal_controller import HalEVSEController
+        from iso15118.secc import SECCHandler
+        from iso15118.secc.secc_settings import Config as SeccConfig
+        from iso15118.shared.exi_codec import ExificientEXICodec
+
+        # Select HAL adapter based on environment (default 'sim').
+        adapter = os.environ.get("EVSE_HAL_ADAPTER", "sim")
+        hal = create_hal(adapter)
+        self._controller = HalEVSEController(hal)
+
+        config = SeccConfig()
+        config.load_envs(secc_config_path)
+        config.iface = iface
+        return SECCHandler, ExificientEXICodec, config
+
     async def stop(self) -> None:
         if self._task and not self._task.done():
             self._task.cancel()
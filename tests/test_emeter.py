@@ -0,0 +1,18 @@
+import pytest
+
+from src.ccs_sim.emeter import EnergyMeterSim
+
+
+def test_record_batch_matches_per_sample():
+    samples = [(400.0, 100.0, 0.5), (398.5, 80.0, 1.0), (401.0, 30.0, 0.25)]
+    one = EnergyMeterSim()
+    for v, i, dt in samples:
+        one.record_measurement(v, i, dt)
+    batch = EnergyMeterSim()
+    v, i, dt = zip(*samples)
+    batch.record_batch(v, i, dt)
+    # Getters are unrounded, so summation order may differ in the last ulp
+    assert batch.get_total_energy_wh() == pytest.approx(one.get_total_energy_wh())
+    assert batch.get_average_voltage() == pytest.approx(one.get_average_voltage())
+    assert batch.get_average_current() == pytest.approx(one.get_average_current())
+    assert batch.total_ns == one.total_ns == 1_750_000_000
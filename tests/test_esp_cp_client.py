@@ -0,0 +1,70 @@
+import sys
+import json
+import types
+import time
+import threading
+import importlib
+
+
+class _FakeSerial:
+    def __init__(self, *args, **kwargs):
+        self.timeout = kwargs.get("timeout", 0.2)
+        self._rx = []
+        self._lock = threading.Lock()
+        self.is_open = True
+
+    def push_status(self, state: str, mv: int) -> None:
+        st = {
+            "type": "status",
+            "cp_mv": mv,
+            "cp_mv_robust": mv,
+            "state": state,
+            "mode": "dc",
+            "pwm": {"enabled": True, "duty": 5, "hz": 1000},
+        }
+        with self._lock:
+            self._rx.append((json.dumps(st) + "\n").encode("utf-8"))
+
+    def write(self, data: bytes):
+        obj = json.loads(data.decode("utf-8"))
+        if obj.get("cmd") == "get_status":
+            self.push_status("A", 12000)
+
+    def readline(self) -> bytes:
+        t0 = time.time()
+        while time.time() - t0 < (self.timeout or 0.1):
+            with self._lock:
+                if self._rx:
+                    return self._rx.pop(0)
+            time.sleep(0.01)
+        return b""
+
+    def close(self):
+        self.is_open = False
+
+
+def test_get_status_batch_drains_in_order(monkeypatch):
+    # Treat cached status as stale so an empty batch triggers a get_status poll
+    monkeypatch.setenv("ESP_CP_STALE_S", "0")
+    fake = types.ModuleType("serial")
+    fake.Serial = _FakeSerial
+    sys.modules["serial"] = fake
+    client_mod = importlib.reload(importlib.import_module("src.evse_hal.esp_cp_client"))
+    c = client_mod.EspCpClient(port="/dev/null")
+    c.connect()
+    try:
+        ser = c._ser  # type: ignore[attr-defined]
+        for state, mv in (("B", 9000), ("C", 6000), ("B", 9000)):
+            ser.push_status(state, mv)
+        deadline = time.time() + 1.0
+        while time.time() < deadline and len(c._frames) < 3:  # type: ignore[attr-defined]
+            time.sleep(0.01)
+        batch = c.get_status_batch(max_n=2, wait_s=0.0)
+        assert [st.state for st in batch] == ["B", "C"]
+        rest = c.get_status_batch(max_n=32, wait_s=0.0)
+        assert [st.state for st in rest] == ["B"]
+        # Nothing buffered: waits for a fresh frame requested via get_status
+        fresh = c.get_status_batch(max_n=32, wait_s=0.5)
+        assert [st.state for st in fresh] == ["A"]
+    finally:
+        c.close()
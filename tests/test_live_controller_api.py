@@ -87,3 +87,34 @@ def test_fault_causes_abort():
     s = c.get('/status').json()
     assert s['phase'] == 'ABORTED'
     assert s['error'] == 'E_STOP'
+
+
+def test_control_write_failure_reported(monkeypatch):
+    from src.ccs_sim.fastapi_app import app, orch
+    c = TestClient(app)
+
+    def _fail(duty):
+        raise RuntimeError("pwm driver offline")
+
+    monkeypatch.setattr(orch._pwm, "set_duty", _fail)
+    r = c.post('/control/pwm', json={"duty": 5.0})
+    assert r.json() == {"status": "error", "message": "pwm driver offline"}
+
+
+def test_control_cp_state_visible_in_status():
+    from src.ccs_sim.fastapi_app import app
+    c = TestClient(app)
+    assert c.post('/control/cp_state', json={"state": "B"}).json()['status'] == 'ok'
+    assert c.get('/status').json()['cp_state'] == 'B'
+    assert c.post('/control/cp_state', json={"state": "A"}).json()['status'] == 'ok'
+    assert c.get('/status').json()['cp_state'] == 'A'
+
+
+def test_vehicle_live_sees_cp_state_change_immediately():
+    from src.ccs_sim.fastapi_app import app
+    c = TestClient(app)
+    c.post('/control/cp_state', json={"state": "A"})
+    assert c.get('/vehicle/live').json()['cp']['state'] == 'A'
+    c.post('/control/cp_state', json={"state": "C"})
+    assert c.get('/vehicle/live').json()['cp']['state'] == 'C'
+    c.post('/control/cp_state', json={"state": "A"})
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from src.ccs_sim.orchestrator import ChargeOrchestrator
+from src.evse_hal.adapters.sim import SimHardware
+
+
+def test_snapshot_does_not_take_session_lock():
+    orch = ChargeOrchestrator(hal=SimHardware())
+    with orch._lock:
+        orch._snap_cache = None
+        assert orch.snapshot()["phase"] == "IDLE"
+
+
+def test_snapshot_cache_dropped_on_transition():
+    orch = ChargeOrchestrator(hal=SimHardware())
+    assert orch.snapshot()["error"] is None
+    orch.inject_fault("E_STOP")
+    assert orch.snapshot()["error"] == "E_STOP"
+
+
+def test_on_change_called_on_transition():
+    orch = ChargeOrchestrator(hal=SimHardware())
+    calls = []
+    orch.on_change(lambda: calls.append(1))
+    orch.set_cp_state("B")
+    assert calls == [1]
+    orch.remove_listener(orch._listeners[0])
+    orch.set_cp_state("A")
+    assert calls == [1]
+
+
+def test_wait_for_vehicle_wakes_on_cp_edge():
+    hal = SimHardware()
+    orch = ChargeOrchestrator(hal=hal)
+    hal.cp().simulate_state("A")
+    t = threading.Thread(target=orch.wait_for_vehicle, daemon=True)
+    t.start()
+    time.sleep(0.05)
+    hal.cp().simulate_state("B")
+    # Well inside the 5 s heartbeat: only the edge can have woken it
+    t.join(timeout=1.0)
+    assert not t.is_alive()
+    assert orch.session_active is True
+    hal.cp().simulate_state("A")
+
+
+def test_snapshot_seq_advances_on_transition():
+    orch = ChargeOrchestrator(hal=SimHardware())
+    seq = orch.snapshot()["seq"]
+    assert orch.snapshot()["seq"] == seq
+    orch.inject_fault("E_STOP")
+    assert orch.snapshot()["seq"] > seq
+
+
+def test_snapshot_ignores_cache_from_older_seq():
+    orch = ChargeOrchestrator(hal=SimHardware())
+    orch.snapshot()
+    stale = orch._snap_cache
+    orch.inject_fault("E_STOP")
+    # A reader that built its snapshot before the transition stores it late
+    orch._snap_cache = stale
+    assert orch.snapshot()["error"] == "E_STOP"
+
+
+def test_control_batch_keeps_order_and_every_cp_transition():
+    hal = SimHardware()
+    orch = ChargeOrchestrator(hal=hal)
+    applied = []
+    release = threading.Event()
+    seen_cp = []
+    hal.cp().on_change(seen_cp.append)
+
+    def set_closed(closed):
+        # Hold the worker on the first write so the rest queue up as one batch
+        release.wait(timeout=1.0)
+        applied.append(("contactor", closed))
+
+    orch._contactor.set_closed = set_closed
+    orch._pwm.set_duty = lambda duty: applied.append(("pwm", duty))
+    orch.submit_control("contactor", True)
+    time.sleep(0.05)
+    for op, value in [
+        ("contactor", True),
+        ("pwm", 5.0),
+        ("contactor", False),
+        ("cp_state", "B"),
+        ("cp_state", "C"),
+        ("pwm", 10.0),
+        ("pwm", 20.0),
+    ]:
+        orch.submit_control(op, value)
+    release.set()
+    deadline = time.monotonic() + 1.0
+    while ("pwm", 20.0) not in applied and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert applied == [
+        ("contactor", True),
+        ("contactor", True),
+        ("pwm", 5.0),
+        ("contactor", False),
+        ("pwm", 20.0),
+    ]
+    assert seen_cp == ["B", "C"]
+
+
+def test_close_unregisters_cp_listener():
+    hal = SimHardware()
+    orch = ChargeOrchestrator(hal=hal)
+    assert len(hal.cp()._listeners) == 1
+    orch.close()
+    assert hal.cp()._listeners == []
+    orch = ChargeOrchestrator(hal=hal)
+    assert len(hal.cp()._listeners) == 1
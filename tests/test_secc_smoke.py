@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SUITE = Path(__file__).resolve().parents[1] / "scripts" / "run_secc_smoke_suite.py"
+
+
+def test_secc_sap_smoke_suite():
+    # Own interpreter: other test modules stub iso15118 in sys.modules. The
+    # runner shares one EXI codec across the four SAP smoke scripts.
+    proc = subprocess.run(
+        [sys.executable, str(SUITE)],
+        cwd=SUITE.parents[1],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if "No module named 'iso15118'" in proc.stderr:
+        pytest.skip("iso15118 not installed")
+    if "result: SKIP (EXI codec unavailable)" in proc.stdout.splitlines()[:1]:
+        pytest.skip("EXI codec unavailable")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
@@ -0,0 +1,14 @@
+from fastapi.testclient import TestClient
+
+
+def test_stream_pushes_on_transition():
+    from src.ccs_sim.fastapi_app import app, orch
+
+    c = TestClient(app)
+    # Long heartbeat, so the second message can only come from the transition
+    with c.websocket_connect("/stream?interval_s=30") as ws:
+        first = ws.receive_json()
+        assert "phase" in first and "cp_state" in first
+        orch.set_cp_state("B")
+        assert ws.receive_json()["cp_state"] == "B"
+    orch.set_cp_state("A")